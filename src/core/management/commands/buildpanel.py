@@ -0,0 +1,37 @@
+import os
+import sys
+
+from core.management import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Rebuild the aligned cross-pair panel of a time unit from the stored quotes"
+
+    @property
+    def choices(self) -> list[str]:
+        return ["1m", "5m", "15m", "30m", "1h", "4h", "1d", "1w"]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--time-unit", choices=self.choices, type=str, required=True
+        )
+
+    def handle(self, *args, **options):
+        sys.path.insert(0, os.getcwd())
+
+        from models.enums import TimeUnits
+        from services.panel import QuotesPanel
+        from utils.service_provider import provide
+
+        panel = provide(QuotesPanel)
+        if not panel.enabled:
+            raise CommandError(
+                "Set CRYPTO_QUOTES_PANEL to the fields to store, e.g. close,volume."
+            )
+        metadata = panel.rebuild(TimeUnits.from_code(options["time_unit"]))
+        if metadata is None:
+            print("No stored quotes for this time unit.")
+            return
+        print(
+            f"Built a {metadata.rows} x {len(metadata.symbols)} panel of {', '.join(metadata.fields)} in {panel.get_folder(TimeUnits.from_code(options['time_unit']))}"
+        )
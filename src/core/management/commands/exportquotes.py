@@ -0,0 +1,102 @@
+import os
+import sys
+
+from core.management import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Stream stored quotes to stdout or a file as CSV, NDJSON or Arrow IPC"
+
+    @property
+    def choices(self) -> list[str]:
+        return ["1m", "5m", "15m", "30m", "1h", "4h", "1d", "1w", "1M"]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--symbol",
+            type=str,
+            nargs="+",
+            help="Symbols to export, all stored series if omitted",
+        )
+        parser.add_argument(
+            "--time-unit", choices=self.choices, type=str, nargs="+", required=True
+        )
+        parser.add_argument(
+            "--format", choices=["csv", "ndjson", "arrow"], type=str, default="csv"
+        )
+        parser.add_argument(
+            "--output", type=str, default="-", help="File path, - for stdout"
+        )
+        parser.add_argument("--start", type=str, help="Epoch milliseconds or date")
+        parser.add_argument("--end", type=str, help="Epoch milliseconds or date")
+        parser.add_argument("--columns", type=str, help="Comma-separated columns")
+        parser.add_argument("--chunk-size", type=int, default=100000)
+
+    def handle(self, *args, **options):
+        sys.path.insert(0, os.getcwd())
+
+        from models.enums import TimeUnits
+        from models.pair import Pair
+        from services.exporters.quotes import QuotesExporter
+        from services.storages.base import QuotesStorage
+        from utils.etc import to_milliseconds
+        from utils.service_provider import provide
+
+        try:
+            start = to_milliseconds(options["start"])
+            end = to_milliseconds(options["end"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        storage = provide(QuotesStorage)
+        time_units = [TimeUnits.from_code(code) for code in options["time_unit"]]
+        # Only stored series are exported: the pairs list may require a download.
+        if options["symbol"]:
+            series = [
+                (Pair.from_symbol(symbol.upper()), time_unit)
+                for symbol in options["symbol"]
+                for time_unit in time_units
+            ]
+        else:
+            series = [
+                (Pair.from_symbol(symbol), time_unit)
+                for symbol, time_unit in sorted(
+                    storage.available_series(),
+                    key=lambda item: (item[0], item[1].value),
+                )
+                if time_unit in time_units
+            ]
+        series = [
+            (pair, time_unit)
+            for pair, time_unit in series
+            if storage.series_version(pair, time_unit) is not None
+        ]
+        if not series:
+            raise CommandError(
+                "No stored quotes match the given symbols and time units."
+            )
+
+        exporter = provide(QuotesExporter)
+        columns = options["columns"].split(",") if options["columns"] else None
+        output = (
+            sys.stdout.buffer
+            if options["output"] == "-"
+            else open(options["output"], "wb")
+        )
+        try:
+            exported = exporter.export(
+                series,
+                output,
+                options["format"],
+                columns=columns,
+                start=start,
+                end=end,
+                chunk_size=options["chunk_size"],
+            )
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+        print(
+            f"Successfully exported {exported} quotes from {len(series)} series.",
+            file=sys.stderr,
+        )
@@ -1,7 +1,7 @@
 import os
 import sys
 
-from core.management import BaseCommand
+from core.management import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
@@ -15,7 +15,31 @@ class Command(BaseCommand):
         parser.add_argument(
             "--time-unit", choices=self.choices, type=str, required=True
         )
-        parser.add_argument("--symbol", type=str, required=True)
+        symbols = parser.add_mutually_exclusive_group(required=True)
+        symbols.add_argument("--symbol", type=str)
+        symbols.add_argument(
+            "--all",
+            action="store_true",
+            help="Update every active pair, most stale and most traded first",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="With --all, import that many pairs at once in worker processes",
+        )
+        parser.add_argument(
+            "--shard-index",
+            type=int,
+            default=int(os.getenv("CRYPTO_QUOTES_SHARD_INDEX", "0")),
+            help="With --all, only update the pairs of this shard",
+        )
+        parser.add_argument(
+            "--shard-count",
+            type=int,
+            default=int(os.getenv("CRYPTO_QUOTES_SHARD_COUNT", "1")),
+            help="Number of shards the pairs are split between",
+        )
 
     def handle(self, *args, **options):
         sys.path.insert(0, os.getcwd())
@@ -28,4 +52,14 @@ class Command(BaseCommand):
         tu = TimeUnits.from_code(options["time_unit"])
         quotes_storer = provide(QuotesPairStorer)
 
-        quotes_storer.store_quotes_for_pair(pair, time_unit=tu)
+        if options["all"]:
+            if not 0 <= options["shard_index"] < options["shard_count"]:
+                raise CommandError("--shard-index must be lower than --shard-count.")
+            quotes_storer.store_all_quotes(
+                time_unit=tu,
+                workers=options["workers"],
+                shard_index=options["shard_index"],
+                shard_count=options["shard_count"],
+            )
+        else:
+            quotes_storer.store_quotes_for_pair(pair, time_unit=tu)
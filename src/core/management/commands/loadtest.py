@@ -0,0 +1,124 @@
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+from core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Run a full-universe import against the local mock exchange and report its performance"
+
+    @property
+    def choices(self) -> list[str]:
+        return ["1m", "5m", "15m", "30m", "1h", "4h", "1d", "1w"]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--time-unit", choices=self.choices, type=str, default="1h")
+        parser.add_argument(
+            "--workers", type=int, default=1, help="Import worker processes"
+        )
+        parser.add_argument(
+            "--symbols", type=int, default=50, help="Number of synthetic pairs"
+        )
+        parser.add_argument(
+            "--history-days", type=int, default=365, help="Days of history before now"
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0, help="Added latency per request, in ms"
+        )
+        parser.add_argument(
+            "--jitter", type=float, default=0, help="Latency jitter, in ms"
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0,
+            help="Ratio of injected 429 responses",
+        )
+        parser.add_argument(
+            "--weight-limit",
+            type=int,
+            default=1200,
+            help="Request weight allowed per minute",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--routes",
+            type=str,
+            default=None,
+            help="Pair routes as in CRYPTO_QUOTES_ROUTES, e.g. '*USDT=cryptocom'",
+        )
+        parser.add_argument(
+            "--data-folder",
+            type=str,
+            default=None,
+            help="Where quotes are written, a temporary folder by default",
+        )
+
+    def handle(self, *args, **options):
+        sys.path.insert(0, os.getcwd())
+
+        from services.mock_exchange import MockExchangeServer, MockExchangeSettings
+
+        server = MockExchangeServer(
+            ("127.0.0.1", 0),
+            MockExchangeSettings(
+                symbols=options["symbols"],
+                history_days=options["history_days"],
+                latency=options["latency"] / 1000,
+                jitter=options["jitter"] / 1000,
+                error_rate=options["error_rate"],
+                weight_limit=options["weight_limit"],
+                seed=options["seed"],
+            ),
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        with tempfile.TemporaryDirectory() as temporary_folder:
+            # Read when the services are first imported, and inherited by worker processes.
+            os.environ["BINANCE_API_URL"] = f"{server.url}/api"
+            os.environ["CRYPTOCOM_API_URL"] = f"{server.url}/v2/public"
+            os.environ["CRYPTOCOM_CANDLES_URL"] = f"{server.url}/exchange/v1/public"
+            if options["routes"]:
+                os.environ["CRYPTO_QUOTES_ROUTES"] = options["routes"]
+            os.environ["CRYPTO_QUOTES_FOLDER"] = (
+                options["data_folder"] or temporary_folder
+            )
+
+            from models.enums import TimeUnits
+            from services.importers.pairs_importer import PairsImporter
+            from services.quotes_storer import QuotesPairStorer
+            from utils.service_provider import provide
+
+            time_unit = TimeUnits.from_code(options["time_unit"])
+            started = time.perf_counter()
+            pairs = provide(PairsImporter).import_all_pairs()
+            saved = provide(QuotesPairStorer).store_all_quotes(
+                time_unit, workers=options["workers"]
+            )
+            elapsed = time.perf_counter() - started
+            server.shutdown()
+            # Only what this run saved: the data folder may hold previous runs.
+            rows = sum(saved.values())
+            report = {
+                "pairs": len(pairs),
+                "series": sum(1 for count in saved.values() if count),
+                "rows": rows,
+                "seconds": round(elapsed, 3),
+                "rows_per_second": round(rows / elapsed, 1),
+                "exchange": server.stats(),
+                # ru_maxrss is in KB on Linux.
+                "peak_rss_mb": {
+                    "main": round(
+                        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+                    ),
+                    "workers": round(
+                        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1
+                    ),
+                },
+            }
+        print(json.dumps(report, indent=4))
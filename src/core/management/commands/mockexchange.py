@@ -0,0 +1,64 @@
+import os
+import sys
+
+from core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Serve a local mock of the Binance and Crypto.com public APIs with synthetic data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", type=str, default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8001)
+        parser.add_argument(
+            "--symbols", type=int, default=50, help="Number of synthetic pairs"
+        )
+        parser.add_argument(
+            "--history-days", type=int, default=365, help="Days of history before now"
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0, help="Added latency per request, in ms"
+        )
+        parser.add_argument(
+            "--jitter", type=float, default=0, help="Latency jitter, in ms"
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0,
+            help="Ratio of injected 429 responses",
+        )
+        parser.add_argument(
+            "--weight-limit",
+            type=int,
+            default=1200,
+            help="Request weight allowed per minute",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        sys.path.insert(0, os.getcwd())
+
+        from services.mock_exchange import MockExchangeServer, MockExchangeSettings
+
+        server = MockExchangeServer(
+            (options["host"], options["port"]),
+            MockExchangeSettings(
+                symbols=options["symbols"],
+                history_days=options["history_days"],
+                latency=options["latency"] / 1000,
+                jitter=options["jitter"] / 1000,
+                error_rate=options["error_rate"],
+                weight_limit=options["weight_limit"],
+                seed=options["seed"],
+            ),
+        )
+        print(
+            f"Mock exchange on {server.url}: BINANCE_API_URL={server.url}/api CRYPTOCOM_API_URL={server.url}/v2/public"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
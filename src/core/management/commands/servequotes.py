@@ -0,0 +1,44 @@
+import os
+import sys
+
+from core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Serve stored quotes over a local read-only HTTP API"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", type=str, default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8000)
+        parser.add_argument(
+            "--cache-size", type=int, default=256, help="LRU cache size, in MB"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=10000, help="Quotes per streamed chunk"
+        )
+
+    def handle(self, *args, **options):
+        sys.path.insert(0, os.getcwd())
+
+        from services.cache import QuotesCache
+        from services.repositories.quotes import QuotesRepository
+        from services.server import QuotesServer
+        from services.storages.base import QuotesStorage
+        from utils.service_provider import provide
+
+        cache = provide(QuotesCache)
+        cache.resize(options["cache_size"] * 1024 * 1024)
+        server = QuotesServer(
+            (options["host"], options["port"]),
+            quotes_repository=provide(QuotesRepository),
+            storage=provide(QuotesStorage),
+            cache=cache,
+            chunk_size=options["chunk_size"],
+        )
+        print(f"Serving quotes on http://{options['host']}:{options['port']}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
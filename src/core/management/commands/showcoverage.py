@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+
+from core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Print the stored series coverage from the quotes manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--symbol", type=str, nargs="+", help="Only show these symbols"
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Rebuild the manifest by scanning every stored series first",
+        )
+
+    def handle(self, *args, **options):
+        sys.path.insert(0, os.getcwd())
+
+        from dataclasses import asdict
+
+        from models.pair import Pair
+        from models.schema import QUOTE_COLUMNS
+        from services.manifest import QuotesManifest
+        from services.storages.base import QuotesStorage
+        from utils.service_provider import provide
+
+        manifest = provide(QuotesManifest)
+        if options["rebuild"]:
+            storage = provide(QuotesStorage)
+            for symbol, time_unit in storage.available_series():
+                pair = Pair.from_symbol(symbol)
+                manifest.replace(
+                    symbol,
+                    time_unit,
+                    storage.iter_quotes(pair, time_unit, columns=QUOTE_COLUMNS),
+                    storage.series_size(pair, time_unit),
+                )
+
+        entries = [
+            asdict(entry)
+            for entry in sorted(
+                manifest.entries(), key=lambda entry: (entry.symbol, entry.time_unit)
+            )
+            if not options["symbol"] or entry.symbol in options["symbol"]
+        ]
+        print(json.dumps(entries, indent=4))
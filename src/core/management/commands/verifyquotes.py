@@ -0,0 +1,78 @@
+import json
+import os
+import sys
+
+from core.management import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Check stored quotes integrity and optionally repair them"
+
+    @property
+    def choices(self) -> list[str]:
+        return ["1m", "5m", "15m", "30m", "1h", "4h", "1d", "1w", "1M"]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--symbol", type=str, nargs="+", help="Only verify these symbols"
+        )
+        parser.add_argument(
+            "--time-unit",
+            choices=self.choices,
+            type=str,
+            nargs="+",
+            help="Only verify these time units",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Worker processes, defaults to the CPU count",
+        )
+        parser.add_argument(
+            "--repair", action="store_true", help="Rewrite series with issues"
+        )
+        parser.add_argument(
+            "--output", type=str, default="-", help="Report path, - for stdout"
+        )
+
+    def handle(self, *args, **options):
+        sys.path.insert(0, os.getcwd())
+
+        from services.storages.base import QuotesStorage
+        from services.verifier import QuotesVerifier
+        from utils.service_provider import provide, quotes_compact
+
+        if options["repair"] and quotes_compact:
+            raise CommandError(
+                "Repairing would lose precision, disable CRYPTO_QUOTES_COMPACT first."
+            )
+
+        series = [
+            (symbol, time_unit)
+            for symbol, time_unit in provide(QuotesStorage).available_series()
+            if (not options["symbol"] or symbol in options["symbol"])
+            and (not options["time_unit"] or time_unit.value in options["time_unit"])
+        ]
+        reports = provide(QuotesVerifier).verify_all(
+            series, workers=options["workers"], repair=options["repair"]
+        )
+        summary = {
+            "series": len(reports),
+            "series_with_issues": sum(1 for report in reports if report["issues"]),
+            "series_with_errors": sum(1 for report in reports if "error" in report),
+            "rows": sum(report["rows"] for report in reports),
+            "reports": reports,
+        }
+
+        content = json.dumps(summary, indent=4)
+        if options["output"] == "-":
+            print(content)
+        else:
+            with open(options["output"], "w") as output:
+                output.write(content)
+        print(
+            f"Verified {summary['series']} series, {summary['series_with_issues']} with issues, "
+            f"{summary['series_with_errors']} with errors.",
+            file=sys.stderr,
+        )
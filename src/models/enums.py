@@ -1,4 +1,8 @@
 from enum import Enum
+from typing import Optional
+
+# Longest monthly candle, used wherever monthly candles need a length.
+MONTH_MILLISECONDS = 31 * 24 * 3600 * 1000
 
 
 class TimeUnits(Enum):
@@ -39,3 +43,14 @@ class TimeUnits(Enum):
             self.HOUR4.value: 240,
             self.DAY1.value: 1440,
         }
+
+    @property
+    def milliseconds(self) -> Optional[int]:
+        """
+        Length of a candle in milliseconds, ``None`` for monthly candles
+        whose length varies.
+        """
+        if self is self.MONTH1:
+            return None
+        amount, unit = int(self.value[:-1]), self.value[-1]
+        return amount * {"m": 60, "h": 3600, "d": 86400, "w": 604800}[unit] * 1000
@@ -3,6 +3,11 @@ from typing import Optional
 
 from dataclasses_json import DataClassJsonMixin
 
+ACTIVE_STATUSES = ("TRADING",)
+
+# Snapshot taken when the pairs are imported, kept out of the quote records.
+SNAPSHOT_FIELDS = ("status", "volume_24h", "trades_24h")
+
 
 @dataclass
 class Pair(DataClassJsonMixin):
@@ -10,6 +15,21 @@ class Pair(DataClassJsonMixin):
     base_asset: str
     quote_asset: str
     order_types: Optional[list[str]] = field(default_factory=list)
+    status: Optional[str] = None
+    volume_24h: Optional[float] = None
+    trades_24h: Optional[int] = None
+
+    @classmethod
+    def from_symbol(cls, symbol: str) -> "Pair":
+        """
+        Pair known by its symbol only, which is all storages need to locate
+        its series.
+        """
+        return cls(symbol=symbol, base_asset="", quote_asset="")
 
     def __str__(self) -> str:
         return self.symbol
+
+    @property
+    def is_active(self) -> bool:
+        return self.status is None or self.status in ACTIVE_STATUSES
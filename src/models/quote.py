@@ -4,7 +4,7 @@ from typing import Optional
 from dataclasses_json import DataClassJsonMixin
 from dataclasses_json.core import Json
 
-from models.pair import Pair
+from models.pair import Pair, SNAPSHOT_FIELDS
 from models.enums import TimeUnits
 
 
@@ -23,4 +23,6 @@ class Quote(DataClassJsonMixin):
     def to_dict(self, encode_json=False) -> dict[str, Json]:
         asdict = super(Quote, self).to_dict()
         asdict["time_unit"] = self.time_unit.value
+        for name in SNAPSHOT_FIELDS:
+            asdict["pair"].pop(name, None)
         return asdict
@@ -0,0 +1,50 @@
+KLINE_COLUMNS = [
+    "timestamp",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "close_time",
+    "quote_av",
+    "trades",
+    "tb_base_av",
+    "tb_quote_av",
+    "ignore",
+]
+
+QUOTE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "close_time"]
+
+QUOTE_DTYPES = {
+    "timestamp": "int64",
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "float64",
+    "close_time": "int64",
+    "quote_av": "float64",
+    "trades": "int64",
+    "tb_base_av": "float64",
+    "tb_quote_av": "float64",
+    "ignore": "float64",
+}
+
+COMPACT_QUOTE_DTYPES = {
+    **QUOTE_DTYPES,
+    "open": "float32",
+    "high": "float32",
+    "low": "float32",
+    "close": "float32",
+    "volume": "float32",
+    "quote_av": "float32",
+    "trades": "int32",
+    "tb_base_av": "float32",
+    "tb_quote_av": "float32",
+    "ignore": "float32",
+}
+
+
+def quote_dtypes(columns: list[str], compact: bool = False) -> dict[str, str]:
+    dtypes = COMPACT_QUOTE_DTYPES if compact else QUOTE_DTYPES
+    return {column: dtypes[column] for column in columns if column in dtypes}
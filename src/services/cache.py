@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from injector import singleton, inject
+from pandas import DataFrame
+
+from models.enums import TimeUnits
+from models.pair import Pair
+from services.storages.base import QuotesStorage
+
+
+@dataclass
+class CacheEntry:
+    version: tuple
+    data: DataFrame
+    size: int
+
+
+@singleton
+class QuotesCache:
+    """
+    Size-bounded LRU cache of whole series. Entries are tagged with the
+    storage ``series_version`` so any write by an importer, in this process
+    or another one, invalidates them on the next access. Series larger than
+    the cache are remembered as such and never loaded whole again.
+    """
+
+    @dataclass
+    class Configuration:
+        max_bytes: int = 256 * 1024 * 1024
+
+    @inject
+    def __init__(self, configuration: Configuration, storage: QuotesStorage):
+        self._config = configuration
+        self._storage = storage
+        self._entries: OrderedDict[tuple[str, str], CacheEntry] = OrderedDict()
+        self._oversized: dict[tuple[str, str], tuple] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def resize(self, max_bytes: int):
+        with self._lock:
+            self._config.max_bytes = max_bytes
+            self._oversized.clear()
+            self._evict()
+
+    def get(self, pair: Pair, time_unit: TimeUnits) -> Optional[DataFrame]:
+        """
+        Return the whole series, or ``None`` when it is too large to be
+        cached: callers then read the range they need from the storage.
+        """
+        key = (pair.symbol, time_unit.value)
+        version = self._storage.series_version(pair, time_unit)
+        if version is None:
+            self.invalidate(pair, time_unit)
+            return DataFrame()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.data
+            self.misses += 1
+            if self._oversized.get(key) == version:
+                return None
+
+        data = self._storage.load_quotes(pair, time_unit)
+        size = int(data.memory_usage(index=True).sum())
+        with self._lock:
+            self._pop(key)
+            if size <= self._config.max_bytes:
+                self._entries[key] = CacheEntry(version=version, data=data, size=size)
+                self._size += size
+                self._evict()
+            else:
+                self._oversized[key] = version
+        return data
+
+    def invalidate(
+        self, pair: Optional[Pair] = None, time_unit: Optional[TimeUnits] = None
+    ):
+        with self._lock:
+            for key in list(self._entries):
+                if (pair is None or key[0] == pair.symbol) and (
+                    time_unit is None or key[1] == time_unit.value
+                ):
+                    self._pop(key)
+            for key in list(self._oversized):
+                if (pair is None or key[0] == pair.symbol) and (
+                    time_unit is None or key[1] == time_unit.value
+                ):
+                    del self._oversized[key]
+
+    def _pop(self, key: tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def _evict(self):
+        while self._entries and self._size > self._config.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry.size
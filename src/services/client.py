@@ -1,104 +1,369 @@
+import copy
 import math
 import os
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
 from logging import getLogger
-from time import sleep
-from typing import Any
+from time import sleep, time
+from typing import Any, Callable, Iterator, Optional, TypeVar
 
 from injector import inject
 import requests
 from binance.client import Client
+from binance.exceptions import BinanceAPIException
 from injector import singleton
 from pandas import to_datetime, DataFrame
 
-from models.enums import TimeUnits
+from models.enums import MONTH_MILLISECONDS, TimeUnits
 from models.pair import Pair
+from models.schema import KLINE_COLUMNS, quote_dtypes
 
 logger = getLogger("django")
 
+T = TypeVar("T")
+
+RATE_LIMITED_STATUSES = (418, 429)
+
+
+def retry_rate_limited(send: Callable[[], T], max_retries: int, exchange: str) -> T:
+    """
+    Call ``send`` until it stops failing with a rate limit status, waiting
+    for the ``Retry-After`` delay asked by the exchange or else backing off
+    exponentially. Other errors, and the last failure, are raised.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return send()
+        except (BinanceAPIException, requests.HTTPError) as e:
+            response = e.response
+            if (
+                response is None
+                or response.status_code not in RATE_LIMITED_STATUSES
+                or attempt == max_retries
+            ):
+                raise
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after else min(2**attempt, 60)
+            logger.warning(
+                f"Rate limited by {exchange} ({response.status_code}), retrying in {delay}s"
+            )
+            sleep(delay)
+
+
+class QuotesProvider(ABC):
+    """
+    Exchange the quotes of a pair are downloaded from. Whatever the
+    exchange, pages are normalised to ``KLINE_COLUMNS`` so every provider
+    feeds the same storage layout.
+    """
+
+    NAME: str
+    HISTORY_START = datetime(2017, 1, 1)
+    CANDLES_PER_REQUEST: int
+    REQUEST_WEIGHT = 1
+
+    @classmethod
+    def estimate_weight(cls, missing_candles: int, new_series: bool) -> int:
+        """
+        Request weight of downloading ``missing_candles``, including the
+        request locating the last available candle.
+        """
+        return (
+            1 + math.ceil(missing_candles / cls.CANDLES_PER_REQUEST)
+        ) * cls.REQUEST_WEIGHT
+
+    @abstractmethod
+    def iter_needed_pair_quotes(
+        self, pair: Pair, time_unit: "TimeUnits", last_timestamp: Optional[int]
+    ) -> Iterator[DataFrame]:
+        """
+        Yield the candles following ``last_timestamp`` (or the whole history
+        when ``None``) in chronological pages.
+        """
+        pass
+
+    @abstractmethod
+    def get_activity(self) -> dict[str, tuple[float, Optional[int]]]:
+        """
+        24h quote volume and trade count per symbol. Exchanges without trade
+        counts return ``None`` for them.
+        """
+        pass
+
+
 @singleton
-class CryptoComClient:
+class CryptoComClient(QuotesProvider):
+    NAME = "cryptocom"
     BASE_URL = "https://api.crypto.com/v2/public"
+    CANDLES_URL = "https://api.crypto.com/exchange/v1/public"
+    CANDLES_PER_REQUEST = 300
+    TIMEFRAMES = {
+        "1m": "1m",
+        "5m": "5m",
+        "15m": "15m",
+        "30m": "30m",
+        "1h": "1h",
+        "4h": "4h",
+        "1d": "1D",
+        "1w": "7D",
+    }
 
     @dataclass
     class Configuration:
         api_key: str = os.getenv("CRYPTOCOM_API_KEY")
         api_secret: str = os.getenv("CRYPTOCOM_API_SECRET")
+        base_url: Optional[str] = os.getenv("CRYPTOCOM_API_URL")
+        candles_url: Optional[str] = os.getenv("CRYPTOCOM_CANDLES_URL")
+        max_retries: int = 5
 
     @inject
     def __init__(self, config: Configuration):
         self._config = config
+        self._session = requests.Session()
+
+    @classmethod
+    def estimate_weight(cls, missing_candles: int, new_series: bool) -> int:
+        windows = math.ceil(missing_candles / cls.CANDLES_PER_REQUEST)
+        if not new_series:
+            return windows * cls.REQUEST_WEIGHT
+        # The listing date of a new series is bisected over the whole history first.
+        bisection = 2 + math.ceil(math.log2(max(windows, 1)))
+        return (windows + bisection) * cls.REQUEST_WEIGHT
+
+    @property
+    def base_url(self) -> str:
+        return self._config.base_url or self.BASE_URL
+
+    @property
+    def candles_url(self) -> str:
+        return self._config.candles_url or self.CANDLES_URL
+
+    def iter_needed_pair_quotes(
+        self, pair: Pair, time_unit: "TimeUnits", last_timestamp: Optional[int]
+    ) -> Iterator[DataFrame]:
+        if time_unit.value not in self.TIMEFRAMES:
+            raise ValueError(f"Crypto.com has no {time_unit.value} candles")
+        instrument = f"{pair.base_asset}_{pair.quote_asset}"
+        interval = time_unit.milliseconds
+        window = self.CANDLES_PER_REQUEST * interval
+        now = int(time() * 1000)
+        if last_timestamp is not None:
+            start = last_timestamp + interval
+        else:
+            start = self._find_history_start(instrument, time_unit, now)
+            if start is None:
+                return
+        logger.info(
+            f"Downloading {pair.symbol} // {time_unit.value} candles from Crypto.com since {start}"
+        )
+        # Windows hold at most one request worth of candles, whichever end the API favours.
+        while start <= now:
+            candles = self._get_candles(
+                instrument, time_unit, start, start + window - 1
+            )
+            if candles:
+                yield self._build_dataframe(candles, interval)
+            start += window
+
+    def _find_history_start(
+        self, instrument: str, time_unit: "TimeUnits", now: int
+    ) -> Optional[int]:
+        """
+        Bisect the listing date: a window ending at ``t`` holds candles
+        if and only if the instrument was listed before ``t``.
+        """
+        window = self.CANDLES_PER_REQUEST * time_unit.milliseconds
+
+        def listed_before(end: int) -> bool:
+            return (
+                len(self._get_candles(instrument, time_unit, end - window + 1, end)) > 0
+            )
+
+        low, high = int(self.HISTORY_START.timestamp() * 1000), now
+        if not listed_before(high):
+            return None
+        if listed_before(low):
+            return low - window + 1
+        while high - low > window:
+            middle = (low + high) // 2
+            if listed_before(middle):
+                high = middle
+            else:
+                low = middle
+        return low + 1
+
+    def _get_candles(
+        self, instrument: str, time_unit: "TimeUnits", start: int, end: int
+    ) -> list[dict[str, Any]]:
+        params = {
+            "instrument_name": instrument,
+            "timeframe": self.TIMEFRAMES[time_unit.value],
+            "count": self.CANDLES_PER_REQUEST,
+            "start_ts": start,
+            "end_ts": end,
+        }
+
+        def send() -> requests.Response:
+            response = self._session.get(
+                f"{self.candles_url}/get-candlestick", params=params
+            )
+            response.raise_for_status()
+            return response
+
+        response = retry_rate_limited(send, self._config.max_retries, "Crypto.com")
+        candles = response.json().get("result", {}).get("data") or []
+        return [candle for candle in candles if start <= candle["t"] <= end]
+
+    @staticmethod
+    def _build_dataframe(candles: list[dict[str, Any]], interval: int) -> DataFrame:
+        # Crypto.com candles have no quote volume, trades count nor taker volumes.
+        rows = [
+            [
+                candle["t"],
+                candle["o"],
+                candle["h"],
+                candle["l"],
+                candle["c"],
+                candle["v"],
+                candle["t"] + interval - 1,
+                "nan",
+                0,
+                "nan",
+                "nan",
+                0,
+            ]
+            for candle in sorted(candles, key=lambda candle: candle["t"])
+        ]
+        return DataFrame(rows, columns=KLINE_COLUMNS).astype(
+            quote_dtypes(KLINE_COLUMNS)
+        )
 
     def get_available_instruments(self):
-        req = requests.get(f"{self.BASE_URL}/get-instruments")
+        req = requests.get(f"{self.base_url}/get-instruments")
         return req.json().get("result")
 
+    def get_activity(self) -> dict[str, tuple[float, Optional[int]]]:
+        req = requests.get(f"{self.base_url}/get-ticker")
+        tickers = req.json().get("result", {}).get("data", [])
+        return {
+            ticker["i"].replace("_", ""): (self._quote_volume(ticker), None)
+            for ticker in tickers
+        }
+
+    @staticmethod
+    def _quote_volume(ticker: dict[str, Any]) -> float:
+        if ticker.get("vv") is not None:
+            return float(ticker["vv"])
+        return float(ticker.get("v") or 0) * float(ticker.get("a") or 0)
+
+
 @singleton
-class BinanceClient(Client):
+class BinanceClient(Client, QuotesProvider):
     @dataclass
     class Configuration:
         api_key: str = os.getenv("BINANCE_API_KEY")
         api_secret: str = os.getenv("BINANCE_API_SECRET")
+        api_url: Optional[str] = os.getenv("BINANCE_API_URL")
+        max_retries: int = 5
+        weight_limit: int = 1200
 
+    NAME = "binance"
     PUBLIC_API_VERSION = "v3"
+    CANDLES_PER_REQUEST = 1000
+    REQUEST_WEIGHT = 2
 
     @inject
     def __init__(self, config: Configuration):
         self._config = config
+        if self._config.api_url:
+            # Set before the parent constructor, which pings the API.
+            self.API_URL = self._config.api_url
 
         super(BinanceClient, self).__init__(
             api_key=self._config.api_key, api_secret=self._config.api_secret
         )
 
-    def get_needed_pair_quotes(
-        self, pair: Pair, time_unit: "TimeUnits", existing_data: DataFrame
+    def _request(
+        self, method, uri: str, signed: bool, force_params: bool = False, **kwargs
     ):
+        """
+        Retry rate limited requests after the delay asked by the exchange,
+        and pause until the next minute when the used weight nears the limit.
+        """
+        result = retry_rate_limited(
+            lambda: super(BinanceClient, self)._request(
+                method, uri, signed, force_params, **copy.deepcopy(kwargs)
+            ),
+            self._config.max_retries,
+            "Binance",
+        )
+        self._throttle()
+        return result
+
+    def _throttle(self):
+        used_weight = self.response.headers.get("X-MBX-USED-WEIGHT-1M")
+        if (
+            used_weight is not None
+            and int(used_weight) >= 0.9 * self._config.weight_limit
+        ):
+            delay = 60 - time() % 60
+            logger.info(
+                f"Used weight {used_weight}/{self._config.weight_limit}, pausing {delay:.1f}s"
+            )
+            sleep(delay)
+
+    def get_available_instruments(self):
+        return self.get_exchange_info()
+
+    def get_activity(self) -> dict[str, tuple[float, Optional[int]]]:
+        return {
+            ticker["symbol"]: (float(ticker["quoteVolume"]), int(ticker["count"]))
+            for ticker in self.get_ticker()
+        }
+
+    def iter_needed_pair_quotes(
+        self, pair: Pair, time_unit: "TimeUnits", last_timestamp: Optional[int]
+    ) -> Iterator[DataFrame]:
+        """
+        Yield the klines following ``last_timestamp`` one page at a time, as
+        they are downloaded, so that a whole backfill never sits in memory.
+        """
         oldest_point, newest_point = self._get_minutes_of_new_data(
-            pair.symbol, time_unit.value, existing_data
+            pair.symbol, time_unit.value, last_timestamp
         )
         delta_min = (newest_point - oldest_point).total_seconds() / 60
-        available_data = math.ceil(delta_min / time_unit.binsize)
+        interval_min = (time_unit.milliseconds or MONTH_MILLISECONDS) / 60000
+        available_data = math.ceil(delta_min / interval_min)
         logger.info(
             f"Downloading {delta_min} minutes of new data available for {pair.symbol}, i.e. {available_data} instances of {time_unit.value} data."
         )
         if delta_min < 1:
             return
-        klines = self.get_historical_klines(
+        klines = self.get_historical_klines_generator(
             pair.symbol,
             time_unit.value,
             oldest_point.strftime("%d %b %Y %H:%M:%S"),
             newest_point.strftime("%d %b %Y %H:%M:%S"),
         )
-        return self._build_dataframe(klines)
+        while True:
+            page = list(islice(klines, self.CANDLES_PER_REQUEST))
+            if not page:
+                return
+            yield self._build_dataframe(page)
 
     def _build_dataframe(self, klines: list[dict[str, Any]]):
-        data = DataFrame(
-            klines,
-            columns=[
-                "timestamp",
-                "open",
-                "high",
-                "low",
-                "close",
-                "volume",
-                "close_time",
-                "quote_av",
-                "trades",
-                "tb_base_av",
-                "tb_quote_av",
-                "ignore",
-            ],
-        )
-        return data
+        data = DataFrame(klines, columns=KLINE_COLUMNS)
+        return data.astype(quote_dtypes(KLINE_COLUMNS))
 
     def _get_minutes_of_new_data(
-        self, symbol: str, time_unit: "TimeUnits", data: DataFrame
+        self, symbol: str, time_unit: "TimeUnits", last_timestamp: Optional[int]
     ):
-        if len(data) > 0:
-            old = datetime.fromtimestamp(data["timestamp"].iloc[-1] / 1000)
+        if last_timestamp is not None:
+            old = datetime.fromtimestamp(last_timestamp / 1000)
         else:
-            old = datetime.strptime("1 Jan 2017", "%d %b %Y")
+            old = self.HISTORY_START
         new = to_datetime(
             self.get_klines(symbol=symbol, interval=time_unit)[-1][0], unit="ms"
         )
@@ -0,0 +1,131 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from logging import getLogger
+from typing import BinaryIO, Optional
+
+import numpy as np
+from injector import singleton, inject
+from pandas import DataFrame
+
+from models.enums import TimeUnits
+from models.pair import Pair
+from models.schema import QUOTE_COLUMNS, quote_dtypes
+from services.storages.base import QuotesStorage
+
+logger = getLogger()
+
+
+class QuotesWriter(ABC):
+    def __init__(self, output: BinaryIO, columns: list[str], dtypes: dict[str, str]):
+        self._output = output
+        self._columns = columns
+        self._dtypes = dtypes
+
+    @abstractmethod
+    def write(self, chunk: DataFrame):
+        pass
+
+    def close(self):
+        self._output.flush()
+
+
+class CsvWriter(QuotesWriter):
+    def __init__(self, output, columns, dtypes):
+        super().__init__(output, columns, dtypes)
+        self._output.write((",".join(columns) + "\n").encode())
+
+    def write(self, chunk):
+        self._output.write(chunk.to_csv(index=False, header=False).encode())
+
+
+class NdjsonWriter(QuotesWriter):
+    def write(self, chunk):
+        records = chunk.to_json(orient="records", lines=True).rstrip("\n")
+        self._output.write((records + "\n").encode())
+
+
+class ArrowWriter(QuotesWriter):
+    def __init__(self, output, columns, dtypes):
+        super().__init__(output, columns, dtypes)
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("Arrow export requires the 'pyarrow' package") from None
+
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema(
+            [
+                (
+                    (column, pyarrow.from_numpy_dtype(np.dtype(dtypes[column])))
+                    if column in dtypes
+                    else (column, pyarrow.string())
+                )
+                for column in columns
+            ]
+        )
+        self._writer = pyarrow.ipc.new_stream(self._output, self._schema)
+
+    def write(self, chunk):
+        batch = self._pyarrow.RecordBatch.from_pandas(
+            chunk, schema=self._schema, preserve_index=False
+        )
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+        super().close()
+
+
+WRITERS = {"csv": CsvWriter, "ndjson": NdjsonWriter, "arrow": ArrowWriter}
+
+
+@singleton
+class QuotesExporter:
+    @dataclass
+    class Configuration:
+        chunk_size: int = 100000
+
+    @inject
+    def __init__(self, configuration: Configuration, storage: QuotesStorage):
+        self._config = configuration
+        self._storage = storage
+
+    def export(
+        self,
+        series: list[tuple[Pair, TimeUnits]],
+        output: BinaryIO,
+        output_format: str = "csv",
+        columns: Optional[list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> int:
+        """
+        Stream the given series one after the other into ``output``. When
+        several series are exported, ``symbol`` and ``time_unit`` columns
+        are prepended so the concatenated rows stay distinguishable.
+        """
+        columns = list(columns or QUOTE_COLUMNS)
+        if "timestamp" not in columns:
+            columns = ["timestamp", *columns]
+        multiple = len(series) > 1
+        output_columns = ["symbol", "time_unit", *columns] if multiple else columns
+        writer = WRITERS[output_format](output, output_columns, quote_dtypes(columns))
+        chunk_size = chunk_size or self._config.chunk_size
+
+        exported = 0
+        for pair, time_unit in series:
+            for chunk in self._storage.iter_quotes(
+                pair, time_unit, columns, start, end, chunk_size
+            ):
+                if len(chunk) == 0:
+                    continue
+                chunk = chunk.reindex(columns=columns)
+                if multiple:
+                    chunk.insert(0, "time_unit", time_unit.value)
+                    chunk.insert(0, "symbol", pair.symbol)
+                writer.write(chunk)
+                exported += len(chunk)
+            logger.info(f"[EXPORT] {pair.symbol} // {time_unit.value} exported")
+        writer.close()
+        return exported
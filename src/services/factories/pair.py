@@ -15,4 +15,11 @@ class PairFactory:
             base_asset=symbol_info.get("baseAsset") or symbol_info.get("base_currency"),
             quote_asset=symbol_info.get("quoteAsset") or symbol_info.get("quote_currency"),
             order_types=symbol_info.get("orderTypes"),
+            status=self._get_status(symbol_info),
         )
+
+    @staticmethod
+    def _get_status(symbol_info: dict[str, Any]) -> str:
+        if "status" in symbol_info:
+            return symbol_info["status"]
+        return "TRADING" if symbol_info.get("tradable", True) else "HALT"
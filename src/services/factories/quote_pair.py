@@ -13,9 +13,10 @@ class QuotesFactory:
     def build_from_dataframe(
         self, data: DataFrame, pair: Pair, time_unit: TimeUnits
     ) -> list[Quote]:
-        return data.apply(
-            lambda row: self.build_quote_from_dict(row, pair, time_unit), axis=1
-        ).to_list()
+        return [
+            self.build_quote_from_dict(row, pair, time_unit)
+            for row in data.to_dict("records")
+        ]
 
     def build_quote_from_pair(
         self, pair: Pair, time_unit: TimeUnits, objs: list[QuotePairJSON]
@@ -1,5 +1,6 @@
 import json
 import logging
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -9,7 +10,9 @@ from injector import singleton, inject
 from models.pair import Pair
 from services.client import BinanceClient, CryptoComClient
 from services.factories.pair import PairFactory
+from services.providers import QuotesProviders
 from utils.etc import create_folder_and_parents
+from utils.locks import file_lock
 
 logger = logging.getLogger("")
 
@@ -22,9 +25,14 @@ class PairsImporter:
 
     @inject
     def __init__(
-        self, config: Configuration, client: CryptoComClient, pair_factory: PairFactory
+        self,
+        config: Configuration,
+        client: CryptoComClient,
+        pair_factory: PairFactory,
+        providers: QuotesProviders,
     ):
         self._client = client
+        self._providers = providers
         self._pair_factory = pair_factory
         self._config = config
         create_folder_and_parents(self._config.file_folder_path)
@@ -38,16 +46,39 @@ class PairsImporter:
         symbols = data.get("symbols") or data.get("instruments")
 
         pairs = [self._build_pair(symbol_info) for symbol_info in symbols]
-        if not self.pair_file_path.exists():
-            self.pair_file_path.touch()
-
-        self.pair_file_path.write_text(
-            json.dumps([pair.to_dict() for pair in pairs], indent=4)
-        )
+        self._add_activity(pairs)
+        self._save_pairs(pairs)
 
         print(f"Successfully downloaded {len(pairs)} at {self.pair_file_path.absolute()}.")
 
         return pairs
 
+    def _save_pairs(self, pairs: list[Pair]):
+        # Readers of other processes only ever see a complete file.
+        folder = self._config.file_folder_path
+        with file_lock(folder / ".available_pairs.lock"):
+            temporary_path = folder / ".available_pairs.json.tmp"
+            temporary_path.write_text(
+                json.dumps([pair.to_dict() for pair in pairs], indent=4)
+            )
+            os.replace(temporary_path, self.pair_file_path)
+
     def _build_pair(self, symbol_info: dict[str, Any]):
         return self._pair_factory.build_pair_from_dict(symbol_info)
+
+    def _add_activity(self, pairs: list[Pair]):
+        # Activity comes from the exchange each pair is downloaded from. Only
+        # Binance reports trade counts, Crypto.com pairs get their volume only.
+        routed = {}
+        for pair in pairs:
+            routed.setdefault(self._providers.name_for(pair), []).append(pair)
+        for name, provider_pairs in routed.items():
+            try:
+                activity = self._providers.get(name).get_activity()
+            except Exception as e:
+                logger.warning(f"Could not retrieve {name} pairs activity: {e}")
+                continue
+            for pair in provider_pairs:
+                pair.volume_24h, pair.trades_24h = activity.get(
+                    pair.symbol, (None, None)
+                )
@@ -0,0 +1,86 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Optional
+
+from injector import singleton, inject
+
+from models.enums import TimeUnits
+from models.pair import Pair
+
+logger = getLogger()
+
+
+def _import_series(pair: Pair, time_unit: str, prefetch_pages: int) -> int:
+    from services.importers.quotes import QuotesImporter
+    from utils.service_provider import provide
+
+    return provide(QuotesImporter).import_quotes(
+        pair, TimeUnits.from_code(time_unit), prefetch_pages=prefetch_pages
+    )
+
+
+@singleton
+class ParallelQuotesImporter:
+    """
+    Import several series at once. Each series is handled by a worker
+    process, where a thread downloads the next kline pages while the
+    process parses, serialises and writes the current one. Pages never
+    leave the process that consumes them, and parsing/encoding scale with
+    the number of workers instead of sharing one GIL.
+    """
+
+    @dataclass
+    class Configuration:
+        workers: Optional[int] = None
+        prefetch_pages: int = 2
+
+    @inject
+    def __init__(self, configuration: Configuration):
+        self._config = configuration
+
+    def import_all(
+        self,
+        pairs: list[Pair],
+        time_unit: TimeUnits,
+        workers: Optional[int] = None,
+    ) -> dict[str, int]:
+        """
+        Return the number of saved quotes per symbol. A failing series is
+        logged and left out, the others are still imported.
+        """
+        workers = workers or self._config.workers
+        saved = {}
+        # Spawned workers build their own client and storage instead of inheriting them.
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _import_series, pair, time_unit.value, self._config.prefetch_pages
+                ): pair
+                for pair in pairs
+            }
+            try:
+                self._collect(futures, time_unit, saved)
+            except BaseException:
+                # e.g. Ctrl-C: only the series being imported are waited for.
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        return saved
+
+    @staticmethod
+    def _collect(
+        futures: dict[Future, Pair], time_unit: TimeUnits, saved: dict[str, int]
+    ):
+        for future in as_completed(futures):
+            pair = futures[future]
+            try:
+                saved[pair.symbol] = future.result()
+            except Exception as e:
+                logger.error(f"[IMPORT] {pair.symbol} // {time_unit.value} failed: {e}")
+                continue
+            logger.info(
+                f"[IMPORT] {pair.symbol} // {time_unit.value}: {saved[pair.symbol]} quotes"
+            )
@@ -1,19 +1,22 @@
-import json
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from logging import getLogger
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 from injector import singleton, inject
-from pandas import DataFrame, read_csv
+from pandas import DataFrame
 
 from models.enums import TimeUnits
 from models.pair import Pair
-from models.quote import Quote
-from services.client import BinanceClient
-from services.factories.quote_pair import QuotesFactory
-
+from models.schema import QUOTE_COLUMNS
+from services.indicators import IndicatorsStage
+from services.manifest import ManifestEntry, QuotesManifest
+from services.panel import QuotesPanel
+from services.providers import QuotesProviders
+from services.storages.base import QuotesStorage
 from utils.etc import create_folder_and_parents
+from utils.locks import series_lock
+from utils.prefetch import prefetch
 
 logger = getLogger()
 
@@ -28,87 +31,167 @@ class QuotesImporter:
     def __init__(
         self,
         configuration: Configuration,
-        quote_factory: QuotesFactory,
-        client: BinanceClient,
+        providers: QuotesProviders,
+        storage: QuotesStorage,
+        indicators: IndicatorsStage,
+        manifest: QuotesManifest,
+        panel: QuotesPanel,
     ):
         self._config = configuration
-        self._quote_factory = quote_factory
-        self._client = client
+        self._providers = providers
+        self._storage = storage
+        self._indicators = indicators
+        self._manifest = manifest
+        self._panel = panel
 
-        create_folder_and_parents(self.json_folder)
-        create_folder_and_parents(self.csv_folder)
+        create_folder_and_parents(self.locks_folder)
 
     @property
-    def json_folder(self) -> Path:
-        return self._config.file_folder_path / "json"
+    def locks_folder(self) -> Path:
+        return self._config.file_folder_path / "locks"
 
     @property
-    def csv_folder(self) -> Path:
-        return self._config.file_folder_path / "csv"
-
-    def import_quotes(self, pair: Pair, time_unit: TimeUnits) -> list[Quote]:
-        csv_file = self.get_csv_name_for_pair(pair, time_unit)
-        json_file = self.get_json_name_for_pair(pair, time_unit)
-        existing_data = self._retrieve_existing_data(csv_file)
-        data = self._client.get_needed_pair_quotes(pair, time_unit, existing_data)
-
-        if data is not None:
-            new_data = self._merge_missing_data(data, existing_data)
-            self._save_csv(data, csv_file)
-        else:
-            new_data = existing_data
-        new_data.drop_duplicates(["timestamp"], inplace=True)
-        quotes = self._quote_factory.build_from_dataframe(new_data, pair, time_unit)
-        self._save_json(json_file, quotes)
-        logger.info(f"[JSON] {pair.symbol} // {time_unit.value} succeed ")
-        return quotes
-
-    def _build_files(self, pair: Pair, time_unit: TimeUnits):
-        file_name = f"{pair.symbol}-{time_unit.value}-data"
-        filename_csv = self._quotes_repo.csv_folder / f"{file_name}.csv"
-        filename_json = self._quotes_repo.json_folder / f"{file_name}.json"
-        return filename_csv, filename_json
-
-    def _save_csv(self, new_data: DataFrame, file_name: Path):
-        new_data.to_csv(file_name, index=False)
-
-    def _save_json(self, file_name_json: Path, list_quotes: list[Quote]):
-        existing_quotes = (
-            json.loads(file_name_json.read_text()) if file_name_json.exists() else []
-        )
-        existing_quotes_ts = [quote.get("timestamp") for quote in existing_quotes]
-
-        file_name_json.write_text(
-            json.dumps(
-                [
-                    quote.to_dict()
-                    for quote in list_quotes
-                    if quote.timestamp not in existing_quotes_ts
-                ]
-                + existing_quotes,
-                indent=4,
+    def location(self) -> str:
+        return self._storage.location
+
+    def import_quotes(
+        self, pair: Pair, time_unit: TimeUnits, prefetch_pages: int = 0
+    ) -> int:
+        """
+        Download the candles following the last stored one and return how
+        many were saved. Pages flow from the client to the storage one at a
+        time, so memory stays bounded by a page whatever the backfill depth.
+        With ``prefetch_pages``, up to that many pages are downloaded by a
+        background thread while the current one is processed. Pages are
+        handed to the manifest, indicators and panel once the storage has
+        committed them, and are held until then.
+        """
+        # Workers sharing the data folder never update the same series at once.
+        with series_lock(
+            self.locks_folder, pair.symbol, time_unit.value, blocking=False
+        ) as locked:
+            if not locked:
+                logger.info(
+                    f"{pair.symbol} // {time_unit.value} is being updated by another worker, skipped"
+                )
+                return 0
+            if self._storage.recover(pair, time_unit):
+                logger.info(
+                    f"{pair.symbol} // {time_unit.value}: recovered an interrupted save"
+                )
+            entry = self._reconcile_entry(pair, time_unit)
+            last_timestamp = entry.last_timestamp if entry is not None else None
+            updated = (
+                replace(entry)
+                if entry is not None
+                else ManifestEntry(pair.symbol, time_unit.value)
             )
+            rows = updated.rows
+            pending: list[DataFrame] = []
+
+            def commit():
+                for page in pending:
+                    updated.append(page, None)
+                    self._indicators.update(pair, time_unit, page)
+                    self._panel.update(pair, time_unit, page)
+                pending.clear()
+
+            pages = prefetch(
+                self._providers.for_pair(pair).iter_needed_pair_quotes(
+                    pair, time_unit, last_timestamp
+                ),
+                prefetch_pages,
+            )
+            try:
+                saved = self._storage.save_quotes(
+                    pair,
+                    time_unit,
+                    self._new_pages(pages, last_timestamp, pending),
+                    on_commit=commit,
+                )
+            finally:
+                # Pages kept by a failed save were committed as well.
+                if updated.rows != rows:
+                    updated.bytes = self._storage.series_size(pair, time_unit)
+                    self._manifest.save(updated)
+        logger.info(
+            f"[{self._storage.__class__.__name__}] {pair.symbol} // {time_unit.value} succeed "
         )
-
-    def _merge_missing_data(
-        self, new_data: DataFrame, existing_data: Optional[DataFrame]
-    ):
-        if len(existing_data) > 0 and len(new_data) > 0:
-            return existing_data.append(new_data)
-        return new_data
+        return saved
 
     @staticmethod
-    def _retrieve_existing_data(file_path: Path) -> DataFrame:
-        if file_path.exists():
-            data_df = read_csv(file_path)
-        else:
-            data_df = DataFrame()
-        return data_df
-
-    def get_csv_name_for_pair(self, pair: Pair, time_unit: TimeUnits) -> Path:
-        file_name = f"{pair.symbol}-{time_unit.value}-data"
-        return self.csv_folder / f"{file_name}.csv"
-
-    def get_json_name_for_pair(self, pair: Pair, time_unit: TimeUnits) -> Path:
-        file_name = f"{pair.symbol}-{time_unit.value}-data"
-        return self.json_folder / f"{file_name}.json"
+    def _new_pages(
+        pages: Iterable[DataFrame],
+        last_timestamp: Optional[int],
+        pending: list[DataFrame],
+    ) -> Iterator[DataFrame]:
+        for page in pages:
+            if last_timestamp is not None:
+                page = page[page["timestamp"] > last_timestamp]
+            page = page.drop_duplicates(["timestamp"])
+            if len(page) == 0:
+                continue
+            pending.append(page)
+            yield page
+            last_timestamp = int(page["timestamp"].iloc[-1])
+
+    def reconcile_manifest(self, pairs: list[Pair], time_unit: TimeUnits) -> int:
+        """
+        Rebuild the missing or stale manifest entries of the stored series
+        of ``pairs`` and return how many were rebuilt, so that the last
+        timestamps are then read from the manifest. Series being updated by
+        another worker are left to it.
+        """
+        rebuilt = 0
+        for pair in pairs:
+            if self._is_current(self._manifest.get(pair, time_unit), pair, time_unit):
+                continue
+            with series_lock(
+                self.locks_folder, pair.symbol, time_unit.value, blocking=False
+            ) as locked:
+                if not locked:
+                    continue
+                self._storage.recover(pair, time_unit)
+                if self._reconcile_entry(pair, time_unit) is not None:
+                    rebuilt += 1
+        return rebuilt
+
+    def get_last_timestamp(self, pair: Pair, time_unit: TimeUnits) -> Optional[int]:
+        entry = self._manifest.get(pair, time_unit)
+        if self._is_current(entry, pair, time_unit):
+            return entry.last_timestamp
+        return self._storage.last_timestamp(pair, time_unit)
+
+    def _is_current(
+        self, entry: Optional[ManifestEntry], pair: Pair, time_unit: TimeUnits
+    ) -> bool:
+        """
+        Cheaply check that the manifest entry describes the stored series:
+        entries are keyed by symbol and time unit only, so the series may
+        have been deleted, rewritten or belong to another backend.
+        """
+        if entry is None:
+            return False
+        size = self._storage.series_size(pair, time_unit)
+        if size is None:
+            return entry.bytes is None and self._storage.has_quotes(pair, time_unit)
+        return entry.bytes == size
+
+    def _reconcile_entry(
+        self, pair: Pair, time_unit: TimeUnits
+    ) -> Optional[ManifestEntry]:
+        # A missing or stale entry is rebuilt before new rows are appended to it.
+        entry = self._manifest.get(pair, time_unit)
+        if self._is_current(entry, pair, time_unit):
+            return entry
+        if entry is None and not self._storage.has_quotes(pair, time_unit):
+            return None
+        logger.info(
+            f"[MANIFEST] {pair.symbol} // {time_unit.value}: rebuilding entry from the storage"
+        )
+        return self._manifest.replace(
+            pair.symbol,
+            time_unit,
+            self._storage.iter_quotes(pair, time_unit, columns=QUOTE_COLUMNS),
+            self._storage.series_size(pair, time_unit),
+        )
@@ -0,0 +1,253 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from injector import singleton, inject
+from pandas import DataFrame, Series
+
+from models.enums import MONTH_MILLISECONDS, TimeUnits
+from models.pair import Pair
+from services.storages.base import QuotesStorage
+from utils.etc import create_folder_and_parents
+
+logger = getLogger()
+
+IndicatorState = dict[str, Any]
+
+# Loaded whatever columns the storage is configured to read by default.
+INDICATOR_COLUMNS = ["timestamp", "high", "low", "close"]
+
+
+def _seeded_ewm(values: np.ndarray, alpha: float, seed: Optional[float]) -> np.ndarray:
+    # Prepending the previous average makes ``adjust=False`` resume exactly where it stopped.
+    if seed is None:
+        return Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    values = np.concatenate([[seed], values])
+    return Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _previous_close(data: DataFrame, state: IndicatorState) -> np.ndarray:
+    closes = data["close"].to_numpy(dtype="float64")
+    previous = state.get("close", np.nan)
+    return np.concatenate([[previous], closes[:-1]])
+
+
+class Indicator(ABC):
+    kind = ""
+
+    def __init__(self, period: int):
+        self.period = period
+
+    @property
+    def column(self) -> str:
+        return f"{self.kind}_{self.period}"
+
+    @abstractmethod
+    def compute(
+        self, data: DataFrame, state: IndicatorState
+    ) -> tuple[np.ndarray, IndicatorState]:
+        """
+        Compute the indicator over the new rows of ``data`` given the state
+        left by the previous update, and return the values with the new state.
+        """
+        pass
+
+
+class SMA(Indicator):
+    kind = "sma"
+
+    def compute(self, data, state):
+        tail = state.get("tail", [])
+        closes = np.concatenate([tail, data["close"].to_numpy(dtype="float64")])
+        values = Series(closes).rolling(self.period).mean().to_numpy()[len(tail) :]
+        # Short chunks keep the closes of previous ones.
+        return values, {
+            "tail": closes[max(0, len(closes) - self.period + 1) :].tolist()
+        }
+
+
+class EMA(Indicator):
+    kind = "ema"
+
+    def compute(self, data, state):
+        closes = data["close"].to_numpy(dtype="float64")
+        values = _seeded_ewm(closes, 2 / (self.period + 1), state.get("value"))
+        return values, {"value": float(values[-1])}
+
+
+class RSI(Indicator):
+    kind = "rsi"
+
+    def compute(self, data, state):
+        closes = data["close"].to_numpy(dtype="float64")
+        delta = closes - _previous_close(data, state)
+        if "close" not in state:
+            delta = delta[1:]
+        alpha = 1 / self.period
+        gain = _seeded_ewm(np.clip(delta, 0, None), alpha, state.get("gain"))
+        loss = _seeded_ewm(np.clip(-delta, 0, None), alpha, state.get("loss"))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            flat = np.where(gain == 0, 50.0, 100.0)
+            values = np.where(loss == 0, flat, 100 - 100 / (1 + gain / loss))
+        if "close" not in state:
+            values = np.concatenate([[np.nan], values])
+        new_state = {"close": float(closes[-1])}
+        if len(gain):
+            new_state.update(gain=float(gain[-1]), loss=float(loss[-1]))
+        return values, new_state
+
+
+class ATR(Indicator):
+    kind = "atr"
+
+    def compute(self, data, state):
+        high = data["high"].to_numpy(dtype="float64")
+        low = data["low"].to_numpy(dtype="float64")
+        previous_close = _previous_close(data, state)
+        true_range = np.fmax(
+            high - low,
+            np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)),
+        )
+        values = _seeded_ewm(true_range, 1 / self.period, state.get("value"))
+        return values, {
+            "close": float(data["close"].iloc[-1]),
+            "value": float(values[-1]),
+        }
+
+
+INDICATORS = {indicator.kind: indicator for indicator in (SMA, EMA, RSI, ATR)}
+
+
+def build_indicator(spec: str) -> Indicator:
+    kind, _, period = spec.strip().lower().partition("_")
+    if kind not in INDICATORS or not period.isdigit():
+        raise ValueError(
+            f"Unknown indicator '{spec}', expected one of {list(INDICATORS)} followed by a period, e.g. sma_20"
+        )
+    return INDICATORS[kind](int(period))
+
+
+@singleton
+class IndicatorsStage:
+    @dataclass
+    class Configuration:
+        file_folder_path: Path
+        indicators: list[str] = field(default_factory=list)
+
+    @inject
+    def __init__(self, configuration: Configuration, storage: QuotesStorage):
+        self._config = configuration
+        self._storage = storage
+        self._indicators = [build_indicator(spec) for spec in self._config.indicators]
+
+        if self.enabled:
+            create_folder_and_parents(self.indicators_folder)
+
+    @property
+    def enabled(self) -> bool:
+        return len(self._indicators) > 0
+
+    @property
+    def columns(self) -> list[str]:
+        return [indicator.column for indicator in self._indicators]
+
+    @property
+    def indicators_folder(self) -> Path:
+        return self._config.file_folder_path / "indicators"
+
+    def update(
+        self, pair: Pair, time_unit: TimeUnits, data: Optional[DataFrame]
+    ) -> int:
+        """
+        Compute the configured indicators for the rows of ``data`` newer than
+        the last processed candle, append them next to the quotes and return
+        how many rows were computed. The importer only hands over the newly
+        downloaded rows: without a previous state, or when stored rows were
+        imported since the state was saved (e.g. by a run without
+        indicators), the missing range is read from the storage.
+        """
+        if not self.enabled or data is None or len(data) == 0:
+            return 0
+
+        state = self._load_state(pair, time_unit)
+        if state.get("columns") != self.columns:
+            state = {"columns": self.columns}
+            self.get_data_file(pair, time_unit).unlink(missing_ok=True)
+        if "timestamp" in state:
+            data = data[data["timestamp"] > state["timestamp"]]
+            if len(data) == 0:
+                return 0
+        if "timestamp" not in state or self._has_gap(
+            state["timestamp"], data, time_unit
+        ):
+            start = state.get("timestamp")
+            chunks = self._storage.iter_quotes(
+                pair,
+                time_unit,
+                columns=INDICATOR_COLUMNS,
+                start=start + 1 if start is not None else None,
+            )
+        else:
+            chunks = [data]
+
+        rows = sum(
+            self._append(pair, time_unit, state, chunk)
+            for chunk in chunks
+            if len(chunk)
+        )
+        logger.info(f"[INDICATORS] {pair.symbol} // {time_unit.value}: {rows} rows")
+        return rows
+
+    def reset(self, pair: Pair, time_unit: TimeUnits):
+        """
+        Forget the indicators of a series whose stored quotes were rewritten,
+        so that the next update recomputes them from the storage.
+        """
+        self.get_data_file(pair, time_unit).unlink(missing_ok=True)
+        self.get_state_file(pair, time_unit).unlink(missing_ok=True)
+
+    @staticmethod
+    def _has_gap(last_timestamp: int, data: DataFrame, time_unit: TimeUnits) -> bool:
+        interval = time_unit.milliseconds or MONTH_MILLISECONDS
+        return int(data["timestamp"].iloc[0]) - last_timestamp > interval
+
+    def _append(
+        self, pair: Pair, time_unit: TimeUnits, state: dict[str, Any], data: DataFrame
+    ) -> int:
+        result = DataFrame({"timestamp": data["timestamp"].to_numpy()})
+        for indicator in self._indicators:
+            values, state[indicator.column] = indicator.compute(
+                data, state.get(indicator.column, {})
+            )
+            result[indicator.column] = values
+        state["timestamp"] = int(data["timestamp"].iloc[-1])
+
+        data_file = self.get_data_file(pair, time_unit)
+        result.to_csv(data_file, mode="a", index=False, header=not data_file.exists())
+        self._save_state(pair, time_unit, state)
+        return len(result)
+
+    def get_data_file(self, pair: Pair, time_unit: TimeUnits) -> Path:
+        return (
+            self.indicators_folder / f"{pair.symbol}-{time_unit.value}-indicators.csv"
+        )
+
+    def get_state_file(self, pair: Pair, time_unit: TimeUnits) -> Path:
+        return self.indicators_folder / f"{pair.symbol}-{time_unit.value}-state.json"
+
+    def _load_state(self, pair: Pair, time_unit: TimeUnits) -> dict[str, Any]:
+        state_file = self.get_state_file(pair, time_unit)
+        if state_file.exists():
+            return json.loads(state_file.read_text())
+        return {}
+
+    def _save_state(self, pair: Pair, time_unit: TimeUnits, state: dict[str, Any]):
+        state_file = self.get_state_file(pair, time_unit)
+        temporary_file = state_file.with_suffix(".tmp")
+        temporary_file.write_text(json.dumps(state))
+        os.replace(temporary_file, state_file)
@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+import zlib
+from dataclasses import dataclass, asdict
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+from injector import singleton, inject
+from pandas import DataFrame
+
+from models.enums import TimeUnits
+from models.pair import Pair
+from models.schema import QUOTE_COLUMNS
+from utils.etc import create_folder_and_parents
+from utils.locks import file_lock
+
+logger = getLogger()
+
+CHECKSUM_DTYPE = np.dtype(
+    [
+        (column, "<i8" if column in ("timestamp", "close_time") else "<f8")
+        for column in QUOTE_COLUMNS
+    ]
+)
+
+
+def checksum(data: DataFrame, previous: int = 0) -> int:
+    """
+    CRC32 of the packed OHLCV rows, chained from ``previous``. Rows are
+    encoded one after the other, so checksumming appended batches gives the
+    same value as checksumming the whole series at once. Prices and volumes
+    are rounded to ``float32`` first: downloaded values, values read back
+    from any backend and compact (``float32``) loads all agree at that
+    precision. Missing columns count as zeros.
+    """
+    records = np.zeros(len(data), dtype=CHECKSUM_DTYPE)
+    for column in QUOTE_COLUMNS:
+        if column not in data:
+            continue
+        if CHECKSUM_DTYPE[column].kind == "f":
+            records[column] = data[column].to_numpy(dtype="float64").astype("float32")
+        else:
+            records[column] = data[column].to_numpy(dtype="int64")
+    return zlib.crc32(records.tobytes(), previous)
+
+
+@dataclass
+class ManifestEntry:
+    symbol: str
+    time_unit: str
+    first_timestamp: Optional[int] = None
+    last_timestamp: Optional[int] = None
+    rows: int = 0
+    bytes: Optional[int] = None
+    checksum: int = 0
+
+    def append(self, data: DataFrame, byte_size: Optional[int]):
+        timestamps = data["timestamp"]
+        first, last = int(timestamps.min()), int(timestamps.max())
+        self.first_timestamp = (
+            first if self.first_timestamp is None else min(self.first_timestamp, first)
+        )
+        self.last_timestamp = (
+            last if self.last_timestamp is None else max(self.last_timestamp, last)
+        )
+        self.rows += len(data)
+        self.bytes = byte_size
+        self.checksum = checksum(data, self.checksum)
+
+
+@singleton
+class QuotesManifest:
+    """
+    Compact index of the stored series, kept up to date by the importer so
+    that resume points, coverage and available time units never require
+    opening the series files.
+    """
+
+    @dataclass
+    class Configuration:
+        file_folder_path: Path
+
+    @inject
+    def __init__(self, configuration: Configuration):
+        self._config = configuration
+        self._entries: dict[str, ManifestEntry] = {}
+        self._loaded_version: Optional[tuple] = None
+        self._lock = threading.Lock()
+        create_folder_and_parents(self._config.file_folder_path)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self._config.file_folder_path / "manifest.json"
+
+    @property
+    def lock_path(self) -> Path:
+        return self._config.file_folder_path / ".manifest.lock"
+
+    @staticmethod
+    def key(symbol: str, time_unit: TimeUnits) -> str:
+        return f"{symbol}-{time_unit.value}"
+
+    def get(self, pair: Pair, time_unit: TimeUnits) -> Optional[ManifestEntry]:
+        with self._lock:
+            self._refresh()
+            return self._entries.get(self.key(pair.symbol, time_unit))
+
+    def entries(self) -> list[ManifestEntry]:
+        with self._lock:
+            self._refresh()
+            return list(self._entries.values())
+
+    def available_time_units(self) -> list[TimeUnits]:
+        return list({TimeUnits.from_code(entry.time_unit) for entry in self.entries()})
+
+    def save(self, entry: ManifestEntry):
+        """
+        Store an entry updated by the caller, e.g. with the rows it appended.
+        """
+
+        def update(entries: dict[str, ManifestEntry]):
+            entries[self.key(entry.symbol, TimeUnits.from_code(entry.time_unit))] = (
+                entry
+            )
+
+        self._update(update)
+
+    def discard(self, pair: Pair, time_unit: TimeUnits):
+        """
+        Forget the entry of a series whose content is unknown, so that it is
+        rebuilt from the storage when next needed.
+        """
+        self._update(
+            lambda entries: entries.pop(self.key(pair.symbol, time_unit), None)
+        )
+
+    def replace(
+        self,
+        symbol: str,
+        time_unit: TimeUnits,
+        chunks: Iterable[DataFrame],
+        byte_size: Optional[int] = None,
+    ) -> Optional[ManifestEntry]:
+        """
+        Recompute the entry of a series from its whole content, e.g. after a
+        repair or when building the manifest of an existing data folder.
+        Chunks should hold every ``QUOTE_COLUMNS`` column, so that the
+        checksum matches the one recorded by imports.
+        """
+        entry = ManifestEntry(symbol, time_unit.value)
+        for chunk in chunks:
+            if len(chunk) > 0:
+                entry.append(chunk, byte_size)
+
+        def update(entries: dict[str, ManifestEntry]):
+            key = self.key(symbol, time_unit)
+            if entry.rows:
+                entries[key] = entry
+            else:
+                entries.pop(key, None)
+
+        self._update(update)
+        return entry if entry.rows else None
+
+    def _update(self, change: Callable[[dict[str, ManifestEntry]], Any]):
+        # Other processes may write the manifest too: always merge into the file content.
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            change(self._entries)
+            temporary_path = self.manifest_path.with_name(".manifest.json.tmp")
+            temporary_path.write_text(
+                json.dumps({key: asdict(entry) for key, entry in self._entries.items()})
+            )
+            os.replace(temporary_path, self.manifest_path)
+            self._loaded_version = self._version()
+
+    def _refresh(self):
+        version = self._version()
+        if version is None or version == self._loaded_version:
+            return
+        content = json.loads(self.manifest_path.read_text())
+        self._entries = {key: ManifestEntry(**entry) for key, entry in content.items()}
+        self._loaded_version = version
+
+    def _version(self) -> Optional[tuple]:
+        if not self.manifest_path.exists():
+            return None
+        stat = self.manifest_path.stat()
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
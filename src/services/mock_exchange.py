@@ -0,0 +1,403 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import getLogger
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from binance.helpers import interval_to_milliseconds
+
+logger = getLogger()
+
+QUOTE_ASSETS = ("BTC", "USDT", "ETH")
+
+# Request weights of the rate limited endpoints, each exchange having its own limit.
+WEIGHTS = {
+    "/api/v3/ping": ("binance", 1),
+    "/api/v3/time": ("binance", 1),
+    "/api/v3/exchangeInfo": ("binance", 20),
+    "/api/v3/klines": ("binance", 2),
+    "/api/v3/ticker/24hr": ("binance", 80),
+    "/exchange/v1/public/get-candlestick": ("cryptocom", 1),
+}
+
+CRYPTO_COM_TIMEFRAMES = {
+    "1m": 60000,
+    "5m": 300000,
+    "15m": 900000,
+    "30m": 1800000,
+    "1h": 3600000,
+    "4h": 14400000,
+    "1D": 86400000,
+    "7D": 604800000,
+}
+
+
+@dataclass
+class MockExchangeSettings:
+    symbols: int = 50
+    history_days: int = 365
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    weight_limit: int = 1200
+    seed: int = 0
+
+
+@dataclass
+class MockSymbol:
+    symbol: str
+    base_asset: str
+    quote_asset: str
+    listed_at: int
+    tradable: bool
+    phase: float
+    price: float
+
+
+def _unit_hash(*values: Any) -> float:
+    digest = hashlib.blake2b(
+        ":".join(map(str, values)).encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+def build_symbols(settings: MockExchangeSettings, now: int) -> list[MockSymbol]:
+    """
+    Deterministic universe: listing dates are spread over the history, and
+    one pair out of ten is not tradable.
+    """
+    history = settings.history_days * 24 * 3600 * 1000
+    symbols = []
+    for index in range(settings.symbols):
+        base = f"C{index:03d}"
+        quote = QUOTE_ASSETS[index % len(QUOTE_ASSETS)]
+        listed_at = (
+            now
+            - history
+            + int(0.75 * history * _unit_hash(settings.seed, base, "listing"))
+        )
+        symbols.append(
+            MockSymbol(
+                symbol=f"{base}{quote}",
+                base_asset=base,
+                quote_asset=quote,
+                listed_at=listed_at - listed_at % 60000,
+                tradable=index % 10 != 9,
+                phase=2 * np.pi * _unit_hash(settings.seed, base, "phase"),
+                price=10 ** (4 * _unit_hash(settings.seed, base, "price") - 2),
+            )
+        )
+    return symbols
+
+
+def synthetic_klines(
+    symbol: MockSymbol, timestamps: np.ndarray, interval: int
+) -> list[list]:
+    """
+    Klines as returned by Binance. Prices only depend on the candle index,
+    so any window of the same series gives the same values.
+    """
+    index = timestamps // interval
+
+    def close_at(i):
+        return (
+            symbol.price
+            * (1 + 0.2 * np.sin(i / 500 + symbol.phase))
+            * (1 + 0.02 * np.sin(i / 7))
+        )
+
+    close, open_ = close_at(index), close_at(index - 1)
+    spread = 1 + 0.001 * (2 + np.sin(index / 3))
+    high, low = np.maximum(open_, close) * spread, np.minimum(open_, close) / spread
+    volume = 100 * (1.5 + np.sin(index / 11 + symbol.phase))
+    trades = (volume * 3).astype("int64")
+    return [
+        [
+            int(timestamp),
+            f"{o:.8f}",
+            f"{h:.8f}",
+            f"{l:.8f}",
+            f"{c:.8f}",
+            f"{v:.8f}",
+            int(timestamp) + interval - 1,
+            f"{v * c:.8f}",
+            int(n),
+            f"{v / 2:.8f}",
+            f"{v * c / 2:.8f}",
+            "0",
+        ]
+        for timestamp, o, h, l, c, v, n in zip(
+            timestamps, open_, high, low, close, volume, trades
+        )
+    ]
+
+
+class TooManyRequests(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+
+
+class MockExchangeHandler(BaseHTTPRequestHandler):
+    """
+    Binance (``/api/v3/...``) and Crypto.com (``/v2/public/...`` and
+    ``/exchange/v1/public/get-candlestick``) public endpoints used by the
+    downloader, backed by synthetic data.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "MockExchangeServer"
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.server.delay()
+        try:
+            weight = self.server.spend(*WEIGHTS.get(url.path, ("binance", 0)))
+            status, payload = self.server.route(url.path, query)
+        except TooManyRequests as e:
+            weight = self.server.used_weight(WEIGHTS[url.path][0])
+            status = HTTPStatus.TOO_MANY_REQUESTS
+            payload = {"code": -1003, "msg": "Too many requests."}
+            self._send_json(
+                payload, status, weight, {"Retry-After": str(e.retry_after)}
+            )
+        else:
+            self._send_json(payload, status, weight)
+        self.server.record(time.perf_counter() - started, status)
+
+    def log_message(self, format, *args):
+        logger.debug(f"[MOCK] {self.address_string()} {format % args}")
+
+    def _send_json(
+        self, payload, status, weight: int, headers: Optional[dict[str, str]] = None
+    ):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", str(weight))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockExchangeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], settings: MockExchangeSettings):
+        super().__init__(address, MockExchangeHandler)
+        self.settings = settings
+        self.symbols = {
+            symbol.symbol: symbol for symbol in build_symbols(settings, self.now())
+        }
+        self._random = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self._windows: dict[str, int] = {}
+        self._weights: dict[str, int] = {}
+        self._latencies: list[float] = []
+        self._throttled = 0
+        self._routes: dict[str, Callable[[dict[str, str]], tuple[int, Any]]] = {
+            "/api/v3/ping": lambda query: (HTTPStatus.OK, {}),
+            "/api/v3/time": lambda query: (HTTPStatus.OK, {"serverTime": self.now()}),
+            "/api/v3/exchangeInfo": lambda query: (
+                HTTPStatus.OK,
+                self._exchange_info(),
+            ),
+            "/api/v3/ticker/24hr": lambda query: (
+                HTTPStatus.OK,
+                [self._ticker(symbol) for symbol in self.symbols.values()],
+            ),
+            "/api/v3/klines": self._klines,
+            "/v2/public/get-instruments": lambda query: (
+                HTTPStatus.OK,
+                {"code": 0, "result": {"instruments": self._instruments()}},
+            ),
+            "/v2/public/get-ticker": lambda query: (
+                HTTPStatus.OK,
+                {"code": 0, "result": {"data": self._crypto_tickers()}},
+            ),
+            "/exchange/v1/public/get-candlestick": self._candlestick,
+        }
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @staticmethod
+    def now() -> int:
+        return int(time.time() * 1000)
+
+    def delay(self):
+        with self._lock:
+            jitter = self._random.uniform(-1, 1) * self.settings.jitter
+        if self.settings.latency + jitter > 0:
+            time.sleep(self.settings.latency + jitter)
+
+    def spend(self, exchange: str, weight: int) -> int:
+        """
+        Count ``weight`` in the current minute of ``exchange`` and return its
+        used weight, or raise ``TooManyRequests`` over the limit or on an
+        injected error.
+        """
+        if not weight:
+            return 0
+        with self._lock:
+            now = time.time()
+            if int(now // 60) != self._windows.get(exchange):
+                self._windows[exchange], self._weights[exchange] = int(now // 60), 0
+            if self._random.random() < self.settings.error_rate:
+                raise TooManyRequests(1)
+            if self._weights[exchange] + weight > self.settings.weight_limit:
+                raise TooManyRequests(int(60 - now % 60) + 1)
+            self._weights[exchange] += weight
+            return self._weights[exchange]
+
+    def used_weight(self, exchange: str) -> int:
+        with self._lock:
+            return self._weights.get(exchange, 0)
+
+    def record(self, duration: float, status: int):
+        with self._lock:
+            self._latencies.append(duration)
+            if status == HTTPStatus.TOO_MANY_REQUESTS:
+                self._throttled += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            throttled = self._throttled
+        if len(latencies) == 0:
+            return {"requests": 0, "throttled": 0}
+        return {
+            "requests": len(latencies),
+            "throttled": throttled,
+            "server_latency_ms": {
+                f"p{percentile}": round(float(np.percentile(latencies, percentile)), 3)
+                for percentile in (50, 90, 99)
+            }
+            | {"max": round(float(latencies.max()), 3)},
+        }
+
+    def route(self, path: str, query: dict[str, str]) -> tuple[int, Any]:
+        handler = self._routes.get(path)
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {"code": -1, "msg": f"Unknown path {path}"}
+        return handler(query)
+
+    def _exchange_info(self) -> dict[str, Any]:
+        return {
+            "timezone": "UTC",
+            "serverTime": self.now(),
+            "symbols": [
+                {
+                    "symbol": symbol.symbol,
+                    "status": "TRADING" if symbol.tradable else "BREAK",
+                    "baseAsset": symbol.base_asset,
+                    "quoteAsset": symbol.quote_asset,
+                    "orderTypes": ["LIMIT", "MARKET"],
+                }
+                for symbol in self.symbols.values()
+            ],
+        }
+
+    def _ticker(self, symbol: MockSymbol) -> dict[str, Any]:
+        kline = synthetic_klines(
+            symbol, np.array([self.now() // 86400000 * 86400000]), 86400000
+        )[0]
+        return {"symbol": symbol.symbol, "quoteVolume": kline[7], "count": kline[8]}
+
+    def _instruments(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "instrument_name": f"{symbol.base_asset}_{symbol.quote_asset}",
+                "base_currency": symbol.base_asset,
+                "quote_currency": symbol.quote_asset,
+                "tradable": symbol.tradable,
+            }
+            for symbol in self.symbols.values()
+        ]
+
+    def _crypto_tickers(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "i": f"{symbol.base_asset}_{symbol.quote_asset}",
+                "vv": self._ticker(symbol)["quoteVolume"],
+            }
+            for symbol in self.symbols.values()
+        ]
+
+    def _candlestick(self, query: dict[str, str]) -> tuple[int, Any]:
+        symbol = self.symbols.get(query.get("instrument_name", "").replace("_", ""))
+        interval = CRYPTO_COM_TIMEFRAMES.get(query.get("timeframe"))
+        if symbol is None or interval is None:
+            return HTTPStatus.BAD_REQUEST, {"code": 40003, "message": "Invalid request"}
+        count = min(int(query.get("count", 25)), 300)
+
+        # The latest ``count`` candles of the requested range.
+        first = -(-symbol.listed_at // interval) * interval
+        last = self.now() // interval * interval
+        if "end_ts" in query:
+            last = min(last, int(query["end_ts"]) // interval * interval)
+        if "start_ts" in query:
+            first = max(first, -(-int(query["start_ts"]) // interval) * interval)
+        first = max(first, last - (count - 1) * interval)
+        timestamps = (
+            np.arange(first, last + 1, interval, dtype="int64") if last >= first else []
+        )
+        data = [
+            {
+                "t": kline[0],
+                "o": kline[1],
+                "h": kline[2],
+                "l": kline[3],
+                "c": kline[4],
+                "v": kline[5],
+            }
+            for kline in synthetic_klines(
+                symbol, np.asarray(timestamps, dtype="int64"), interval
+            )
+        ]
+        return HTTPStatus.OK, {
+            "code": 0,
+            "method": "public/get-candlestick",
+            "result": {
+                "instrument_name": query["instrument_name"],
+                "interval": query["timeframe"],
+                "data": data,
+            },
+        }
+
+    def _klines(self, query: dict[str, str]) -> tuple[int, Any]:
+        symbol = self.symbols.get(query.get("symbol", ""))
+        if symbol is None:
+            return HTTPStatus.BAD_REQUEST, {"code": -1121, "msg": "Invalid symbol."}
+        interval = query.get("interval")
+        interval_ms = interval_to_milliseconds(interval) if interval else None
+        if not interval_ms or interval.endswith("M"):
+            return HTTPStatus.BAD_REQUEST, {"code": -1120, "msg": "Invalid interval."}
+        limit = min(int(query.get("limit", 500)), 1000)
+
+        # Candles open on multiples of the interval, from the listing to now.
+        first = -(-symbol.listed_at // interval_ms) * interval_ms
+        last = self.now() // interval_ms * interval_ms
+        if "endTime" in query:
+            last = min(last, int(query["endTime"]) // interval_ms * interval_ms)
+        if "startTime" in query:
+            first = max(first, -(-int(query["startTime"]) // interval_ms) * interval_ms)
+            last = min(last, first + (limit - 1) * interval_ms)
+        else:
+            first = max(first, last - (limit - 1) * interval_ms)
+        if last < first:
+            return HTTPStatus.OK, []
+        timestamps = np.arange(first, last + 1, interval_ms, dtype="int64")
+        return HTTPStatus.OK, synthetic_klines(symbol, timestamps, interval_ms)
@@ -0,0 +1,306 @@
+import json
+import os
+from dataclasses import dataclass, field, asdict
+from logging import getLogger
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from injector import singleton, inject
+from pandas import DataFrame
+
+from models.enums import TimeUnits
+from models.pair import Pair
+from services.manifest import QuotesManifest
+from services.storages.base import QuotesStorage
+from utils.etc import create_folder_and_parents
+from utils.locks import file_lock
+
+logger = getLogger()
+
+
+@dataclass
+class PanelMetadata:
+    time_unit: str
+    interval: int
+    origin: int
+    dtype: str
+    fields: list[str]
+    rows: int = 0
+    capacity: int = 0
+    symbols: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Panel:
+    timestamps: np.ndarray
+    symbols: list[str]
+    values: dict[str, np.ndarray]
+
+    def to_frame(self, field_name: str = "close") -> DataFrame:
+        return DataFrame(
+            self.values[field_name], index=self.timestamps, columns=self.symbols
+        )
+
+
+@singleton
+class QuotesPanel:
+    """
+    Timestamp-by-symbol matrices of the configured fields (e.g. close and
+    volume) for every pair of a time unit, aligned on a regular grid and
+    stored as raw row-major files which can be memory-mapped. Candles are
+    written in place after each import; missing candles, including those
+    before a pair was listed, are NaN. Columns are reserved in advance so
+    that new pairs rarely require rewriting the matrices.
+    """
+
+    @dataclass
+    class Configuration:
+        file_folder_path: Path
+        fields: list[str] = field(default_factory=list)
+        dtype: str = "float64"
+        initial_capacity: int = 64
+
+    @inject
+    def __init__(
+        self,
+        configuration: Configuration,
+        storage: QuotesStorage,
+        manifest: QuotesManifest,
+    ):
+        self._config = configuration
+        self._storage = storage
+        self._manifest = manifest
+
+    @property
+    def enabled(self) -> bool:
+        return len(self._config.fields) > 0
+
+    @property
+    def fields(self) -> list[str]:
+        return list(self._config.fields)
+
+    @property
+    def panels_folder(self) -> Path:
+        return self._config.file_folder_path / "panels"
+
+    def get_folder(self, time_unit: TimeUnits) -> Path:
+        return self.panels_folder / time_unit.value
+
+    def load(self, time_unit: TimeUnits) -> Optional[Panel]:
+        """
+        Memory-map the panel of ``time_unit`` read-only.
+        """
+        metadata = self._load_metadata(time_unit)
+        if metadata is None:
+            return None
+        symbols = len(metadata.symbols)
+        return Panel(
+            timestamps=metadata.origin
+            + np.arange(metadata.rows, dtype="int64") * metadata.interval,
+            symbols=list(metadata.symbols),
+            values={
+                field_name: self._map(time_unit, metadata, field_name, "r")[:, :symbols]
+                for field_name in metadata.fields
+            },
+        )
+
+    def update(self, pair: Pair, time_unit: TimeUnits, data: Optional[DataFrame]):
+        """
+        Write the candles of ``data`` into the panel of ``time_unit``.
+        """
+        if not self.enabled or data is None or len(data) == 0:
+            return
+        if time_unit.milliseconds is None:
+            logger.warning(f"[PANEL] {time_unit.value} has no fixed interval, skipped")
+            return
+
+        create_folder_and_parents(self.get_folder(time_unit))
+        with file_lock(self.get_folder(time_unit) / ".lock"):
+            metadata = self._load_metadata(time_unit) or self._create_metadata(
+                time_unit, int(data["timestamp"].min())
+            )
+            self._write(time_unit, metadata, pair.symbol, data)
+            self._save_metadata(time_unit, metadata)
+
+    def rebuild(self, time_unit: TimeUnits) -> Optional[PanelMetadata]:
+        """
+        Build the panel of ``time_unit`` from scratch out of the stored series.
+        """
+        if time_unit.milliseconds is None:
+            raise ValueError(f"{time_unit.value} has no fixed interval")
+        series = [
+            symbol for symbol, tu in self._storage.available_series() if tu == time_unit
+        ]
+        first_timestamps = [
+            entry.first_timestamp
+            for entry in self._manifest.entries()
+            if entry.time_unit == time_unit.value and entry.first_timestamp is not None
+        ]
+
+        folder = self.get_folder(time_unit)
+        create_folder_and_parents(folder)
+        with file_lock(folder / ".lock"):
+            self._clear(time_unit)
+            metadata = None
+            if first_timestamps:
+                metadata = self._create_metadata(time_unit, min(first_timestamps))
+            for symbol in series:
+                metadata = self._write_series(time_unit, metadata, symbol)
+            if metadata is not None:
+                self._save_metadata(time_unit, metadata)
+        return metadata
+
+    def replace_series(self, symbol: str, time_unit: TimeUnits):
+        """
+        Rewrite the column of ``symbol`` out of its stored series, e.g. after
+        rows were removed from it.
+        """
+        if not self.enabled or time_unit.milliseconds is None:
+            return
+
+        folder = self.get_folder(time_unit)
+        create_folder_and_parents(folder)
+        with file_lock(folder / ".lock"):
+            metadata = self._load_metadata(time_unit)
+            if metadata is not None and symbol in metadata.symbols:
+                column = metadata.symbols.index(symbol)
+                for field_name in metadata.fields:
+                    values = self._map(time_unit, metadata, field_name, "r+")
+                    values[:, column] = np.nan
+                    values.flush()
+            metadata = self._write_series(time_unit, metadata, symbol)
+            if metadata is not None:
+                self._save_metadata(time_unit, metadata)
+
+    def _clear(self, time_unit: TimeUnits):
+        for path in self.get_folder(time_unit).iterdir():
+            if path.name != ".lock":
+                path.unlink()
+
+    def _write_series(
+        self, time_unit: TimeUnits, metadata: Optional[PanelMetadata], symbol: str
+    ) -> Optional[PanelMetadata]:
+        for chunk in self._storage.iter_quotes(
+            Pair.from_symbol(symbol),
+            time_unit,
+            columns=["timestamp", *self._config.fields],
+        ):
+            if len(chunk) == 0:
+                continue
+            if metadata is None:
+                metadata = self._create_metadata(
+                    time_unit, int(chunk["timestamp"].min())
+                )
+            self._write(time_unit, metadata, symbol, chunk)
+        return metadata
+
+    def _write(
+        self,
+        time_unit: TimeUnits,
+        metadata: PanelMetadata,
+        symbol: str,
+        data: DataFrame,
+    ):
+        if symbol not in metadata.symbols:
+            metadata.symbols.append(symbol)
+        column = metadata.symbols.index(symbol)
+
+        positions = (
+            data["timestamp"].to_numpy(dtype="int64") - metadata.origin
+        ) // metadata.interval
+        shift = max(0, -int(positions.min()))
+        rows = max(metadata.rows, int(positions.max()) + 1) + shift
+        capacity = metadata.capacity
+        while capacity < len(metadata.symbols):
+            capacity = max(2 * capacity, self._config.initial_capacity)
+        if shift or capacity != metadata.capacity:
+            self._reshape(time_unit, metadata, rows, capacity, shift)
+        elif rows > metadata.rows:
+            self._extend(time_unit, metadata, rows)
+
+        positions = positions + shift
+        for field_name in metadata.fields:
+            values = self._map(time_unit, metadata, field_name, "r+")
+            values[positions, column] = (
+                data[field_name].to_numpy() if field_name in data else np.nan
+            )
+            values.flush()
+
+    def _extend(self, time_unit: TimeUnits, metadata: PanelMetadata, rows: int):
+        # Rows are contiguous: new ones are appended to the end of the files.
+        missing = np.full(
+            (rows - metadata.rows, metadata.capacity), np.nan, dtype=metadata.dtype
+        )
+        for field_name in metadata.fields:
+            with open(self._get_path(time_unit, field_name), "ab") as writer:
+                writer.write(missing.tobytes())
+        metadata.rows = rows
+
+    def _reshape(
+        self,
+        time_unit: TimeUnits,
+        metadata: PanelMetadata,
+        rows: int,
+        capacity: int,
+        shift: int,
+    ):
+        logger.info(
+            f"[PANEL] {time_unit.value}: resizing to {rows} rows x {capacity} symbols"
+        )
+        for field_name in metadata.fields:
+            path = self._get_path(time_unit, field_name)
+            temporary_path = path.with_name(f".{path.name}.tmp")
+            reshaped = np.memmap(
+                temporary_path, dtype=metadata.dtype, mode="w+", shape=(rows, capacity)
+            )
+            reshaped[:] = np.nan
+            if metadata.rows and metadata.capacity:
+                previous = self._map(time_unit, metadata, field_name, "r")
+                reshaped[shift : shift + metadata.rows, : metadata.capacity] = previous
+                del previous
+            reshaped.flush()
+            del reshaped
+            os.replace(temporary_path, path)
+        metadata.origin -= shift * metadata.interval
+        metadata.rows = rows
+        metadata.capacity = capacity
+
+    def _map(
+        self, time_unit: TimeUnits, metadata: PanelMetadata, field_name: str, mode: str
+    ) -> np.ndarray:
+        if metadata.rows == 0 or metadata.capacity == 0:
+            return np.empty((metadata.rows, metadata.capacity), dtype=metadata.dtype)
+        return np.memmap(
+            self._get_path(time_unit, field_name),
+            dtype=metadata.dtype,
+            mode=mode,
+            shape=(metadata.rows, metadata.capacity),
+        )
+
+    def _create_metadata(self, time_unit: TimeUnits, origin: int) -> PanelMetadata:
+        return PanelMetadata(
+            time_unit=time_unit.value,
+            interval=time_unit.milliseconds,
+            origin=origin,
+            dtype=self._config.dtype,
+            fields=list(self._config.fields),
+        )
+
+    def _get_path(self, time_unit: TimeUnits, field_name: str) -> Path:
+        return self.get_folder(time_unit) / f"{field_name}.bin"
+
+    def _get_metadata_path(self, time_unit: TimeUnits) -> Path:
+        return self.get_folder(time_unit) / "panel.json"
+
+    def _load_metadata(self, time_unit: TimeUnits) -> Optional[PanelMetadata]:
+        path = self._get_metadata_path(time_unit)
+        if not path.exists():
+            return None
+        return PanelMetadata(**json.loads(path.read_text()))
+
+    def _save_metadata(self, time_unit: TimeUnits, metadata: PanelMetadata):
+        path = self._get_metadata_path(time_unit)
+        temporary_path = path.with_name(".panel.json.tmp")
+        temporary_path.write_text(json.dumps(asdict(metadata)))
+        os.replace(temporary_path, path)
@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from logging import getLogger
+
+from injector import singleton, inject, ProviderOf
+
+from models.pair import Pair
+from services.client import BinanceClient, CryptoComClient, QuotesProvider
+
+logger = getLogger()
+
+
+@singleton
+class QuotesProviders:
+    """
+    Route every pair to the exchange its quotes are downloaded from. Routes
+    are ``pattern=provider`` rules matched in order against the symbol,
+    e.g. ``*USDT=cryptocom``; unmatched pairs use the default
+    provider. Clients are only built when a pair is routed to them.
+    """
+
+    @dataclass
+    class Configuration:
+        default: str = BinanceClient.NAME
+        routes: list[str] = field(default_factory=list)
+
+    @inject
+    def __init__(
+        self,
+        configuration: Configuration,
+        binance: ProviderOf[BinanceClient],
+        crypto_com: ProviderOf[CryptoComClient],
+    ):
+        self._config = configuration
+        self._providers = {
+            BinanceClient.NAME: binance,
+            CryptoComClient.NAME: crypto_com,
+        }
+        self._routes = [self._parse_route(rule) for rule in self._config.routes]
+        for name in [self._config.default, *(name for _, name in self._routes)]:
+            if name not in self._providers:
+                raise ValueError(
+                    f"Unknown quotes provider {name}, expected one of {', '.join(self.names)}"
+                )
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._providers)
+
+    @staticmethod
+    def _parse_route(rule: str) -> tuple[str, str]:
+        pattern, _, name = rule.strip().partition("=")
+        if not pattern or not name:
+            raise ValueError(
+                f"Invalid quotes route '{rule}', expected pattern=provider, e.g. *USDT=cryptocom"
+            )
+        return pattern, name
+
+    @staticmethod
+    def provider_class(name: str) -> type[QuotesProvider]:
+        return {
+            BinanceClient.NAME: BinanceClient,
+            CryptoComClient.NAME: CryptoComClient,
+        }[name]
+
+    def get(self, name: str) -> QuotesProvider:
+        return self._providers[name].get()
+
+    def name_for(self, pair: Pair) -> str:
+        for pattern, name in self._routes:
+            if fnmatchcase(pair.symbol, pattern):
+                return name
+        return self._config.default
+
+    def for_pair(self, pair: Pair) -> QuotesProvider:
+        return self.get(self.name_for(pair))
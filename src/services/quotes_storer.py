@@ -1,34 +1,196 @@
-from typing import NoReturn, Union
+import math
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import zip_longest
+from logging import getLogger
+from typing import Optional, Union
 
 from injector import singleton, inject
 
-from models.enums import TimeUnits
+from models.enums import MONTH_MILLISECONDS, TimeUnits
 from models.pair import Pair
+from services.client import QuotesProvider
+from services.importers.parallel import ParallelQuotesImporter
 from services.importers.quotes import QuotesImporter
+from services.providers import QuotesProviders
 from services.repositories.pair import PairsRepository
+from services.sharding import PairsSharding
+
+logger = getLogger()
+
+
+@dataclass
+class UpdateJob:
+    pair: Pair
+    provider: str
+    missing_candles: int
+    weight: int
+    priority: float
 
 
 @singleton
 class QuotesPairStorer:
+    @dataclass
+    class Configuration:
+        weight_budget: Optional[int] = None
+        skip_inactive: bool = True
+
     @inject
     def __init__(
-        self, quotes_importer: QuotesImporter, pair_repository: PairsRepository
+        self,
+        configuration: Configuration,
+        quotes_importer: QuotesImporter,
+        pair_repository: PairsRepository,
+        parallel_importer: ParallelQuotesImporter,
+        sharding: PairsSharding,
+        providers: QuotesProviders,
     ):
+        self._config = configuration
         self._pair_repository = pair_repository
         self._quote_importer = quotes_importer
+        self._parallel_importer = parallel_importer
+        self._sharding = sharding
+        self._providers = providers
 
-    def store_all_quotes(self, time_unit: TimeUnits):
+    def store_all_quotes(
+        self,
+        time_unit: TimeUnits,
+        workers: int = 1,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ) -> dict[str, int]:
+        """
+        Update the pairs of this shard and return the number of quotes saved
+        per symbol by this run. The weight budget is spent on them only, so
+        every shard runs with its own budget.
+        """
         available_pair = self._pair_repository.get_available_pairs()
-        for pair in available_pair:
-            self.store_quotes_for_pair(pair, time_unit)
+        if shard_count > 1:
+            available_pair = self._sharding.select(
+                available_pair, shard_index, shard_count
+            )
+        jobs = self.plan_updates(available_pair, time_unit)
+        queues = self._group_by_provider(jobs)
+        if workers > 1:
+            # Interleaved so that the workers keep every provider busy.
+            pairs = [
+                job.pair
+                for batch in zip_longest(*queues.values())
+                for job in batch
+                if job
+            ]
+            saved = self._parallel_importer.import_all(
+                pairs, time_unit, workers=workers
+            )
+            print(
+                f"Successfully load {sum(saved.values())} quotes for {len(saved)}/{len(jobs)} pairs in {self._quote_importer.location}"
+            )
+            return saved
+
+        # Providers have independent rate limits: each one is fetched by its own thread.
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=max(1, len(queues))) as executor:
+            futures = [
+                executor.submit(self._store_queue, queue, time_unit, stop)
+                for queue in queues.values()
+            ]
+            saved = {}
+            try:
+                for future in futures:
+                    saved.update(future.result())
+            except BaseException:
+                # e.g. Ctrl-C: the queues stop after their current pair.
+                stop.set()
+                raise
+        return saved
+
+    def _store_queue(
+        self, jobs: list[UpdateJob], time_unit: TimeUnits, stop: threading.Event
+    ) -> dict[str, int]:
+        # A failing pair, e.g. one its provider doesn't list, must not stop the queue.
+        saved = {}
+        for job in jobs:
+            if stop.is_set():
+                break
+            try:
+                saved[job.pair.symbol] = self.store_quotes_for_pair(job.pair, time_unit)
+            except Exception as e:
+                logger.error(
+                    f"[IMPORT] {job.pair.symbol} // {time_unit.value} failed: {e}"
+                )
+        return saved
+
+    @staticmethod
+    def _group_by_provider(jobs: list[UpdateJob]) -> dict[str, list[UpdateJob]]:
+        queues = {}
+        for job in jobs:
+            queues.setdefault(job.provider, []).append(job)
+        return queues
+
+    def plan_updates(self, pairs: list[Pair], time_unit: TimeUnits) -> list[UpdateJob]:
+        """
+        Drop inactive pairs, order the others by staleness and 24h activity
+        and keep as many as the request weight budget of their provider
+        allows.
+        """
+        if self._config.skip_inactive:
+            inactive = [pair for pair in pairs if not pair.is_active]
+            pairs = [pair for pair in pairs if pair.is_active]
+            logger.info(f"Skipping {len(inactive)} inactive pairs")
+
+        # Built once here, instead of reading every unknown series to plan it.
+        rebuilt = self._quote_importer.reconcile_manifest(pairs, time_unit)
+        if rebuilt:
+            logger.info(f"Rebuilt the manifest entries of {rebuilt} series")
+        now = int(time.time() * 1000)
+        jobs = sorted(
+            (self._build_job(pair, time_unit, now) for pair in pairs),
+            key=lambda job: job.priority,
+            reverse=True,
+        )
+        if self._config.weight_budget is None:
+            return jobs
+
+        scheduled, spent = [], defaultdict(int)
+        for job in jobs:
+            if spent[job.provider] + job.weight <= self._config.weight_budget:
+                scheduled.append(job)
+                spent[job.provider] += job.weight
+        logger.info(
+            f"Scheduled {len(scheduled)}/{len(jobs)} pairs for a weight of {dict(spent)} (budget {self._config.weight_budget} per provider)"
+        )
+        return scheduled
+
+    def _build_job(self, pair: Pair, time_unit: TimeUnits, now: int) -> UpdateJob:
+        last_timestamp = self._quote_importer.get_last_timestamp(pair, time_unit)
+        new_series = last_timestamp is None
+        if new_series:
+            last_timestamp = int(QuotesProvider.HISTORY_START.timestamp() * 1000)
+        interval = time_unit.milliseconds or MONTH_MILLISECONDS
+        missing_candles = max(0, (now - last_timestamp) // interval)
+        provider = self._providers.name_for(pair)
+        # Trade counts compare across quote assets, unlike volumes.
+        activity = 1 + math.log1p(pair.trades_24h or 0)
+        return UpdateJob(
+            pair=pair,
+            provider=provider,
+            missing_candles=missing_candles,
+            # Page sizes and request weights differ between exchanges.
+            weight=self._providers.provider_class(provider).estimate_weight(
+                missing_candles, new_series
+            ),
+            priority=math.log1p(missing_candles) * activity,
+        )
 
     def store_quotes_for_pair(
         self, pair: Union[Pair, str], time_unit: TimeUnits
-    ) -> NoReturn:
+    ) -> int:
         if isinstance(pair, str):
             pair = self._pair_repository.get_pair_from_symbol(pair)
 
-        objs = self._quote_importer.import_quotes(pair, time_unit=time_unit)
-        print(
-            f"Successfully load {len(objs)} quotes in {self._quote_importer.json_folder.absolute()}"
-        )
+        saved = self._quote_importer.import_quotes(pair, time_unit=time_unit)
+        print(f"Successfully load {saved} quotes in {self._quote_importer.location}")
+        return saved
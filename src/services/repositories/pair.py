@@ -1,6 +1,7 @@
 import json
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 from injector import singleton, inject
 
@@ -37,3 +38,15 @@ class PairsRepository:
         return [
             pair for pair in self.get_available_pairs() if pair.symbol == pair_symbol
         ][0]
+
+    def find_stored_pair(self, pair_symbol: str) -> Optional[Pair]:
+        """
+        Same as ``get_pair_from_symbol`` but only looks at the stored pairs
+        list, which is never downloaded, and returns ``None`` if unknown.
+        """
+        if not self.pair_file_path.exists():
+            return None
+        for val in json.loads(self.pair_file_path.read_text()):
+            if val.get("symbol") == pair_symbol:
+                return Pair.from_dict(val)
+        return None
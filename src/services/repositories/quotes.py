@@ -1,13 +1,16 @@
-import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
-from injector import singleton, inject
+from injector import singleton, inject, ProviderOf
+from pandas import DataFrame
 
 from models.enums import TimeUnits
 from models.pair import Pair
+from services.cache import QuotesCache
 from services.importers.quotes import QuotesImporter
+from services.manifest import QuotesManifest
+from services.storages.base import QuotesStorage
 
 
 @singleton
@@ -17,19 +20,51 @@ class QuotesRepository:
         file_folder_path: Path
 
     @inject
-    def __init__(self, configuration: Configuration, quote_importer: QuotesImporter):
+    def __init__(
+        self,
+        configuration: Configuration,
+        quote_importer: ProviderOf[QuotesImporter],
+        storage: QuotesStorage,
+        cache: QuotesCache,
+        manifest: QuotesManifest,
+    ):
         self._config = configuration
         self._quote_importer = quote_importer
+        self._storage = storage
+        self._cache = cache
+        self._manifest = manifest
 
     @property
     def available_tu(self) -> list[TimeUnits]:
-        return [
-            TimeUnits.from_code(file_name.name.split("-")[1])
-            for file_name in self.json_folder.iterdir()
-        ]
+        return (
+            self._manifest.available_time_units()
+            or self._storage.available_time_units()
+        )
 
     def get_pair_quotes(self, pair: Pair, time_unit: TimeUnits) -> list[dict[str, Any]]:
-        path_to_file = self._quote_importer.get_json_name_for_pair(pair, time_unit)
-        if path_to_file.exists():
-            return json.loads(path_to_file.read_text())
-        return self._quote_importer.import_quotes(pair, time_unit)
+        if not self._storage.has_quotes(pair, time_unit):
+            self._quote_importer.get().import_quotes(pair, time_unit)
+        return self._storage.get_quotes(pair, time_unit)
+
+    def get_series(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> DataFrame:
+        data = self._cache.get(pair, time_unit)
+        if data is None:
+            # Series larger than the cache are read range by range.
+            return self._storage.load_quotes(
+                pair, time_unit, start=start, end=end, limit=limit
+            )
+        if data.empty:
+            return data
+        timestamps = data["timestamp"].to_numpy()
+        first = 0 if start is None else timestamps.searchsorted(start, side="left")
+        last = len(data) if end is None else timestamps.searchsorted(end, side="right")
+        if limit is not None:
+            last = min(last, first + limit)
+        return data.iloc[first:last]
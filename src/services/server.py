@@ -0,0 +1,167 @@
+import json
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import getLogger
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from pandas import DataFrame
+
+from models.enums import TimeUnits
+from models.pair import Pair
+from services.cache import QuotesCache
+from services.repositories.quotes import QuotesRepository
+from services.storages.base import QuotesStorage
+from utils.compression import DECOMPRESSION_ERRORS
+from utils.etc import to_milliseconds
+
+logger = getLogger()
+
+# A series read while it is written may end with a partial line or frame.
+STORAGE_ERRORS = (OSError, ValueError, *DECOMPRESSION_ERRORS)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _parse_time(value: Optional[str]) -> Optional[int]:
+    try:
+        return to_milliseconds(value)
+    except ValueError as e:
+        raise BadRequest(str(e))
+
+
+class QuotesRequestHandler(BaseHTTPRequestHandler):
+    """
+    Read-only API:
+        GET /quotes?symbol=ETHBTC&time_unit=4h[&start=..][&end=..][&limit=..]
+        GET /stats
+    ``start`` and ``end`` are epoch milliseconds or any date understood by
+    dateparser. Quotes are streamed as a JSON array using chunked encoding.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "QuotesServer"
+    _headers_sent = False
+
+    def do_GET(self):
+        self._headers_sent = False
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == "/quotes":
+                self._send_quotes(query)
+            elif url.path == "/stats":
+                self._send_json(self.server.stats())
+            else:
+                self._send_json(
+                    {"error": f"Unknown path {url.path}"}, HTTPStatus.NOT_FOUND
+                )
+        except BadRequest as e:
+            self._send_json({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+        except STORAGE_ERRORS as e:
+            logger.exception(f"[SERVER] Failed to read {url.path}?{url.query}")
+            self._send_error(
+                f"Storage unavailable: {e}", HTTPStatus.SERVICE_UNAVAILABLE
+            )
+        except Exception as e:
+            logger.exception(f"[SERVER] Failed to serve {url.path}?{url.query}")
+            self._send_error(f"Internal error: {e}", HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def log_message(self, format, *args):
+        logger.info(f"[SERVER] {self.address_string()} {format % args}")
+
+    def _send_quotes(self, query: dict[str, str]):
+        symbol = query.get("symbol")
+        time_unit = TimeUnits.from_code(query.get("time_unit"))
+        if symbol is None or time_unit is None:
+            raise BadRequest("'symbol' and a valid 'time_unit' are required")
+        limit = query.get("limit")
+        if limit is not None and not limit.isdigit():
+            raise BadRequest(f"Invalid limit: {limit}")
+
+        pair = self.server.get_pair(symbol, time_unit)
+        if pair is None:
+            self._send_json(
+                {"error": f"No stored quotes for {symbol} // {time_unit.value}"},
+                HTTPStatus.NOT_FOUND,
+            )
+            return
+        data = self.server.quotes_repository.get_series(
+            pair,
+            time_unit,
+            start=_parse_time(query.get("start")),
+            end=_parse_time(query.get("end")),
+            limit=int(limit) if limit is not None else None,
+        )
+        self._stream_records(data)
+
+    def _stream_records(self, data: DataFrame):
+        self._headers_sent = True
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        self._write_chunk(b"[")
+        chunk_size = self.server.chunk_size
+        for offset in range(0, len(data), chunk_size):
+            records = data.iloc[offset : offset + chunk_size].to_json(orient="records")
+            body = records[1:-1]
+            if offset > 0:
+                body = "," + body
+            self._write_chunk(body.encode())
+        self._write_chunk(b"]")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, payload: bytes):
+        self.wfile.write(f"{len(payload):X}\r\n".encode() + payload + b"\r\n")
+
+    def _send_error(self, message: str, status: HTTPStatus):
+        if self._headers_sent:
+            # A truncated stream is all that is left to signal the error.
+            self.close_connection = True
+            return
+        self._send_json({"error": message}, status)
+
+    def _send_json(self, payload, status: HTTPStatus = HTTPStatus.OK):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class QuotesServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        quotes_repository: QuotesRepository,
+        storage: QuotesStorage,
+        cache: QuotesCache,
+        chunk_size: int = 10000,
+    ):
+        super().__init__(address, QuotesRequestHandler)
+        self.quotes_repository = quotes_repository
+        self.storage = storage
+        self.cache = cache
+        self.chunk_size = chunk_size
+
+    def get_pair(self, symbol: str, time_unit: TimeUnits) -> Optional[Pair]:
+        # Looked up in the storage on each request, so that new imports are served at once.
+        pair = Pair.from_symbol(symbol.upper())
+        if self.storage.series_version(pair, time_unit) is None:
+            return None
+        return pair
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "series": len(self.storage.available_series()),
+            "cache_bytes": self.cache.size,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+        }
@@ -0,0 +1,80 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Optional
+
+from injector import singleton, inject
+
+from models.pair import Pair
+
+logger = getLogger()
+
+
+def rendezvous_shard(symbol: str, shard_count: int) -> int:
+    """
+    Highest-random-weight hashing: every shard scores the symbol and the best
+    score wins. The result is stable across processes and hosts, and adding
+    or removing a shard only moves the pairs won or lost by that shard.
+    """
+    return max(
+        range(shard_count),
+        key=lambda shard: hashlib.blake2b(
+            f"{shard}:{symbol}".encode(), digest_size=8
+        ).digest(),
+    )
+
+
+@singleton
+class PairsSharding:
+    """
+    Split the pair universe between the workers of a sharded bulk update.
+    Pairs listed in the partition file (a JSON object mapping symbols to
+    shard indexes) go to that shard, the others are hashed. Assignments are
+    computed from the current pair list on each run, so new or delisted
+    pairs are rebalanced without coordination.
+    """
+
+    @dataclass
+    class Configuration:
+        partition_file: Optional[Path] = None
+
+    @inject
+    def __init__(self, configuration: Configuration):
+        self._config = configuration
+
+    @property
+    def partition(self) -> dict[str, int]:
+        if (
+            self._config.partition_file is None
+            or not self._config.partition_file.exists()
+        ):
+            return {}
+        return json.loads(self._config.partition_file.read_text())
+
+    def shard_of(
+        self, symbol: str, shard_count: int, partition: Optional[dict[str, int]] = None
+    ) -> int:
+        partition = self.partition if partition is None else partition
+        if symbol in partition:
+            return partition[symbol] % shard_count
+        return rendezvous_shard(symbol, shard_count)
+
+    def select(
+        self, pairs: list[Pair], shard_index: int, shard_count: int
+    ) -> list[Pair]:
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(
+                f"Shard index {shard_index} out of range for {shard_count} shards"
+            )
+        partition = self.partition
+        selected = [
+            pair
+            for pair in pairs
+            if self.shard_of(pair.symbol, shard_count, partition) == shard_index
+        ]
+        logger.info(
+            f"Shard {shard_index}/{shard_count}: {len(selected)}/{len(pairs)} pairs"
+        )
+        return selected
@@ -0,0 +1,150 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from pandas import DataFrame
+
+from models.enums import TimeUnits
+from models.pair import Pair
+
+
+class QuotesStorage(ABC):
+    """
+    Persistence backend used by ``QuotesImporter`` and ``QuotesRepository``.
+    The concrete backend is chosen in ``utils.service_provider``.
+    """
+
+    @property
+    @abstractmethod
+    def location(self) -> str:
+        pass
+
+    @abstractmethod
+    def load_quotes(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        columns: Optional[list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> DataFrame:
+        """
+        Return the stored quotes of a series ordered by timestamp, optionally
+        restricted to ``start <= timestamp <= end`` (epoch milliseconds).
+        An empty ``DataFrame`` is returned when nothing is stored.
+        """
+        pass
+
+    @abstractmethod
+    def iter_quotes(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        columns: Optional[list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: int = 100000,
+    ) -> Iterator[DataFrame]:
+        """
+        Same as ``load_quotes`` but yields the series in chunks of at most
+        ``chunk_size`` rows, so that memory does not grow with its length.
+        """
+        pass
+
+    @abstractmethod
+    def load_raw_quotes(
+        self, pair: Pair, time_unit: TimeUnits, columns: list[str]
+    ) -> DataFrame:
+        """
+        Return the stored values of a series as they are, without enforcing
+        their dtypes, so that corrupt rows can be inspected instead of
+        failing the read.
+        """
+        pass
+
+    @abstractmethod
+    def save_quotes(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        pages: Iterable[DataFrame],
+        on_commit: Optional[Callable[[], None]] = None,
+    ) -> int:
+        """
+        Append freshly downloaded klines, consuming ``pages`` one at a time,
+        and return the number of rows saved. Memory is bounded by a page.
+        ``on_commit`` is called whenever the pages consumed so far are
+        persisted: backends keep them even if a later page fails.
+        """
+        pass
+
+    def recover(self, pair: Pair, time_unit: TimeUnits) -> bool:
+        """
+        Bring back to a consistent state a series whose last save was
+        interrupted, e.g. by a killed process, and return whether it was.
+        """
+        return False
+
+    @abstractmethod
+    def replace_quotes(self, pair: Pair, time_unit: TimeUnits, data: DataFrame) -> None:
+        """
+        Atomically overwrite a whole series, e.g. after a repair.
+        """
+        pass
+
+    @abstractmethod
+    def has_quotes(self, pair: Pair, time_unit: TimeUnits) -> bool:
+        pass
+
+    @abstractmethod
+    def get_quotes(self, pair: Pair, time_unit: TimeUnits) -> list[dict[str, Any]]:
+        pass
+
+    def stored_pair(self, pair: Pair, time_unit: TimeUnits) -> Optional[Pair]:
+        """
+        Pair metadata saved along the quotes of a series, ``None`` when the
+        backend keeps none.
+        """
+        return None
+
+    @abstractmethod
+    def available_time_units(self) -> list[TimeUnits]:
+        pass
+
+    @abstractmethod
+    def last_timestamp(self, pair: Pair, time_unit: TimeUnits) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def series_size(self, pair: Pair, time_unit: TimeUnits) -> Optional[int]:
+        """
+        Size on disk of the series in bytes, ``None`` if it can't be known.
+        """
+        pass
+
+    @abstractmethod
+    def available_series(self) -> list[tuple[str, TimeUnits]]:
+        pass
+
+    @abstractmethod
+    def series_version(self, pair: Pair, time_unit: TimeUnits) -> Optional[tuple]:
+        """
+        Return a cheap marker which changes whenever the series is written,
+        or ``None`` when nothing is stored.
+        """
+        pass
+
+
+def filter_range(
+    data: DataFrame,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> DataFrame:
+    if start is not None:
+        data = data[data["timestamp"] >= start]
+    if end is not None:
+        data = data[data["timestamp"] <= end]
+    if limit is not None:
+        data = data.head(limit)
+    return data
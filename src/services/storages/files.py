@@ -0,0 +1,493 @@
+import json
+import os
+import textwrap
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO, Union
+
+from injector import singleton, inject
+from pandas import DataFrame, concat, read_csv
+
+from models.enums import TimeUnits
+from models.pair import Pair
+from models.schema import QUOTE_COLUMNS, quote_dtypes
+from services.factories.quote_pair import QuotesFactory
+from services.storages.base import QuotesStorage, filter_range
+from utils.compression import (
+    compressed_path,
+    compression_of,
+    open_compressed,
+    recompress,
+)
+from utils.etc import create_folder_and_parents
+from utils.locks import file_lock
+
+
+class _JsonArrayWriter:
+    """
+    Incrementally write a JSON array formatted like ``json.dump`` would,
+    so that quotes can be serialised page by page.
+    """
+
+    COPY_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, writer: TextIO, indent: Optional[int]):
+        self._writer = writer
+        self._indent = indent
+        self._empty = True
+        self._copying = False
+        self._writer.write("[")
+
+    @property
+    def empty(self) -> bool:
+        return self._empty
+
+    @property
+    def separator(self) -> str:
+        return "," if self._indent is not None else ", "
+
+    def write(self, records: Iterable[dict[str, Any]]):
+        for record in records:
+            text = json.dumps(record, indent=self._indent)
+            if self._indent is not None:
+                text = "\n" + textwrap.indent(text, " " * self._indent)
+            self._write_item(text)
+
+    def copy(self, reader: TextIO):
+        """
+        Append the items of the JSON array read from ``reader`` without
+        parsing them.
+        """
+        leading = ""
+        for text in self._read_items(reader):
+            if self._copying:
+                self._writer.write(text)
+            elif text.strip():
+                self._write_item(leading + text)
+                self._copying = True
+            else:
+                leading += text
+        self._copying = False
+
+    def close(self):
+        self._writer.write(
+            "\n]" if self._indent is not None and not self._empty else "]"
+        )
+
+    def _write_item(self, text: str):
+        if not self._empty:
+            text = self.separator + text
+        self._empty = False
+        self._writer.write(text)
+
+    def _read_items(self, reader: TextIO) -> Iterator[str]:
+        reader.read(1)
+        pending = ""
+        for chunk in iter(partial(reader.read, self.COPY_CHUNK_SIZE), ""):
+            pending += chunk
+            # Hold back the end of the content, which holds the closing bracket.
+            if len(pending) > 16:
+                yield pending[:-16]
+                pending = pending[-16:]
+        yield pending.rstrip()[:-1].rstrip()
+
+
+@singleton
+class FileQuotesStorage(QuotesStorage):
+    PAIR_READ_SIZE = 64 * 1024
+
+    @dataclass
+    class Configuration:
+        file_folder_path: Path
+        columns: Optional[list[str]] = None
+        compact: bool = False
+        compression: Optional[str] = None
+        compression_level: Optional[int] = None
+        json_indent: Optional[int] = 4
+        checkpoint_pages: int = 50
+
+    @inject
+    def __init__(self, configuration: Configuration, quote_factory: QuotesFactory):
+        self._config = configuration
+        self._quote_factory = quote_factory
+
+        create_folder_and_parents(self.json_folder)
+        create_folder_and_parents(self.csv_folder)
+        create_folder_and_parents(self.locks_folder)
+
+    @property
+    def location(self) -> str:
+        return str(self.json_folder.absolute())
+
+    @property
+    def json_folder(self) -> Path:
+        return self._config.file_folder_path / "json"
+
+    @property
+    def csv_folder(self) -> Path:
+        return self._config.file_folder_path / "csv"
+
+    @property
+    def locks_folder(self) -> Path:
+        return self._config.file_folder_path / "locks"
+
+    def load_quotes(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        columns: Optional[list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> DataFrame:
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        if not csv_file.exists():
+            return DataFrame()
+        if start is None and end is None and limit is None:
+            return self.read_quotes(csv_file, columns)
+        # Ranges are read in chunks, up to the end of the range or the limit.
+        chunks, rows = [], 0
+        for chunk in self.iter_quotes(pair, time_unit, columns, start, end):
+            chunks.append(chunk)
+            rows += len(chunk)
+            if limit is not None and rows >= limit:
+                break
+        if not chunks:
+            return DataFrame()
+        return filter_range(concat(chunks), limit=limit)
+
+    def iter_quotes(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        columns: Optional[list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: int = 100000,
+    ) -> Iterator[DataFrame]:
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        if not csv_file.exists():
+            return
+        for chunk in self.read_quotes(csv_file, columns, chunk_size=chunk_size):
+            yield filter_range(chunk, start, end)
+            if end is not None and len(chunk) and chunk["timestamp"].iloc[-1] > end:
+                return
+
+    def load_raw_quotes(
+        self, pair: Pair, time_unit: TimeUnits, columns: list[str]
+    ) -> DataFrame:
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        if not csv_file.exists():
+            return DataFrame()
+        with self._open(csv_file) as reader:
+            header = read_csv(reader, nrows=0).columns
+        if "timestamp" not in header:
+            raise ValueError(f"{csv_file} has no timestamp column")
+        with self._open(csv_file) as reader:
+            return read_csv(
+                reader,
+                usecols=[column for column in columns if column in header],
+                dtype=str,
+            )
+
+    def save_quotes(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        pages: Iterable[DataFrame],
+        on_commit: Optional[Callable[[], None]] = None,
+    ) -> int:
+        # The CSV is committed every ``checkpoint_pages``, so that a failure
+        # late in a deep backfill only loses the pages since the last one.
+        # The JSON file is written once, when the pages are exhausted. A
+        # journal records the last checkpoint until then, so that a process
+        # killed in between is recovered by the next save.
+        self.recover(pair, time_unit)
+        self._convert(pair, time_unit)
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        json_file = self.get_json_name_for_pair(pair, time_unit)
+        csv_size = csv_file.stat().st_size if csv_file.exists() else None
+        journal = {
+            "csv_size": csv_size,
+            "checkpoint_size": csv_size,
+            "first_timestamp": None,
+            "json": self._file_marker(json_file),
+            "pages": 0,
+            "rows": 0,
+        }
+        records = self._write_pages(pair, time_unit, pages, journal, on_commit)
+        journal_file = self.get_journal_file(pair, time_unit)
+        try:
+            self._prepend_json(json_file, records)
+        except BaseException:
+            # Pages are only kept once both files have them.
+            self._roll_back(pair, time_unit, journal)
+            journal_file.unlink(missing_ok=True)
+            raise
+        journal_file.unlink(missing_ok=True)
+        if on_commit is not None:
+            on_commit()
+        return journal["rows"]
+
+    def _write_pages(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        pages: Iterable[DataFrame],
+        journal: dict[str, Any],
+        on_commit: Optional[Callable[[], None]],
+    ) -> Iterator[dict[str, Any]]:
+        # Append the pages to the CSV and yield their JSON records.
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        checkpoint = self._config.checkpoint_pages or None
+        for page in pages:
+            if journal["first_timestamp"] is None:
+                journal["first_timestamp"] = int(page["timestamp"].iloc[0])
+                self._save_journal(pair, time_unit, journal)
+            # Each page is closed as its own gzip member / zstd frame so
+            # the CSV stays readable between pages.
+            self._save_csv(page, csv_file)
+            yield from self._build_records(page, pair, time_unit)
+            journal["rows"] += len(page)
+            journal["pages"] += 1
+            if checkpoint is not None and journal["pages"] % checkpoint == 0:
+                journal["checkpoint_size"] = csv_file.stat().st_size
+                self._save_journal(pair, time_unit, journal)
+                if on_commit is not None:
+                    on_commit()
+
+    def recover(self, pair: Pair, time_unit: TimeUnits) -> bool:
+        journal_file = self.get_journal_file(pair, time_unit)
+        if not journal_file.exists():
+            return False
+        journal = json.loads(journal_file.read_text())
+        json_file = self.get_json_name_for_pair(pair, time_unit)
+        # A JSON file replaced since the journal was written means that the
+        # save completed.
+        if self._file_marker(json_file) == journal["json"]:
+            self._roll_back(pair, time_unit, journal)
+        journal_file.unlink()
+        return True
+
+    def _roll_back(self, pair: Pair, time_unit: TimeUnits, journal: dict[str, Any]):
+        # The CSV goes back to the last checkpoint, whose rows are then added
+        # to the JSON file.
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        self._truncate(csv_file, journal["checkpoint_size"])
+        if journal["checkpoint_size"] != journal["csv_size"]:
+            self._prepend_json(
+                self.get_json_name_for_pair(pair, time_unit),
+                self._read_back_records(
+                    pair, time_unit, csv_file, journal["first_timestamp"]
+                ),
+            )
+
+    def _save_journal(self, pair: Pair, time_unit: TimeUnits, journal: dict[str, Any]):
+        journal_file = self.get_journal_file(pair, time_unit)
+        temporary_file = self._temporary(journal_file)
+        temporary_file.write_text(json.dumps(journal))
+        os.replace(temporary_file, journal_file)
+
+    @staticmethod
+    def _file_marker(file_path: Path) -> Optional[list[int]]:
+        if not file_path.exists():
+            return None
+        stat = file_path.stat()
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def _prepend_json(self, json_file: Path, records: Iterable[dict[str, Any]]):
+        # The JSON file lists the newest downloads first: new quotes are
+        # streamed into a copy which is completed with the existing ones.
+        temporary_file = self._temporary(json_file)
+        try:
+            with self._open(temporary_file, "wt") as writer:
+                json_writer = _JsonArrayWriter(writer, self._config.json_indent)
+                json_writer.write(records)
+                if json_file.exists():
+                    if json_writer.empty:
+                        return
+                    with self._open(json_file) as reader:
+                        json_writer.copy(reader)
+                json_writer.close()
+            os.replace(temporary_file, json_file)
+        finally:
+            temporary_file.unlink(missing_ok=True)
+
+    def _read_back_records(
+        self, pair: Pair, time_unit: TimeUnits, csv_file: Path, start: int
+    ) -> Iterator[dict[str, Any]]:
+        chunks = self.read_quotes(
+            csv_file, QUOTE_COLUMNS, compact=False, chunk_size=100000
+        )
+        for chunk in chunks:
+            yield from self._build_records(filter_range(chunk, start), pair, time_unit)
+
+    def replace_quotes(self, pair: Pair, time_unit: TimeUnits, data: DataFrame) -> None:
+        self._convert(pair, time_unit)
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        with self._open(self._temporary(csv_file), "wt") as writer:
+            data.to_csv(writer, index=False)
+        os.replace(self._temporary(csv_file), csv_file)
+
+        json_file = self.get_json_name_for_pair(pair, time_unit)
+        with self._open(self._temporary(json_file), "wt") as writer:
+            json_writer = _JsonArrayWriter(writer, self._config.json_indent)
+            json_writer.write(self._build_records(data, pair, time_unit))
+            json_writer.close()
+        os.replace(self._temporary(json_file), json_file)
+
+    def has_quotes(self, pair: Pair, time_unit: TimeUnits) -> bool:
+        return self.get_json_name_for_pair(pair, time_unit).exists()
+
+    def get_quotes(self, pair: Pair, time_unit: TimeUnits) -> list[dict[str, Any]]:
+        with self._open(self.get_json_name_for_pair(pair, time_unit)) as reader:
+            return json.load(reader)
+
+    def stored_pair(self, pair: Pair, time_unit: TimeUnits) -> Optional[Pair]:
+        # Only the first record is decoded.
+        json_file = self.get_json_name_for_pair(pair, time_unit)
+        if not json_file.exists():
+            return None
+        with self._open(json_file) as reader:
+            head = reader.read(self.PAIR_READ_SIZE).lstrip()[1:].lstrip()
+        try:
+            record, _ = json.JSONDecoder().raw_decode(head)
+            stored = Pair.from_dict(record["pair"])
+        except (ValueError, KeyError, TypeError):
+            return None
+        return stored if stored.base_asset else None
+
+    def available_time_units(self) -> list[TimeUnits]:
+        return list(
+            {
+                TimeUnits.from_code(file_name.name.split("-")[1])
+                for file_name in self.json_folder.iterdir()
+            }
+        )
+
+    def last_timestamp(self, pair: Pair, time_unit: TimeUnits) -> Optional[int]:
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        if not csv_file.exists():
+            return None
+        timestamps = self.read_quotes(csv_file, columns=["timestamp"])["timestamp"]
+        return int(timestamps.max()) if len(timestamps) else None
+
+    def series_size(self, pair: Pair, time_unit: TimeUnits) -> Optional[int]:
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        return csv_file.stat().st_size if csv_file.exists() else None
+
+    def available_series(self) -> list[tuple[str, TimeUnits]]:
+        series = []
+        for file_name in self.csv_folder.iterdir():
+            symbol, time_unit, *_ = file_name.name.split("-")
+            if not file_name.name.startswith("."):
+                series.append((symbol, TimeUnits.from_code(time_unit)))
+        return series
+
+    def series_version(self, pair: Pair, time_unit: TimeUnits) -> Optional[tuple]:
+        csv_file = self.get_csv_name_for_pair(pair, time_unit)
+        if not csv_file.exists():
+            return None
+        stat = csv_file.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def read_quotes(
+        self,
+        file_path: Path,
+        columns: Optional[list[str]] = None,
+        compact: Optional[bool] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Union[DataFrame, Iterator[DataFrame]]:
+        columns = columns or self._config.columns or QUOTE_COLUMNS
+        if "timestamp" not in columns:
+            columns = ["timestamp", *columns]
+        compact = self._config.compact if compact is None else compact
+        with self._open(file_path) as reader:
+            header = read_csv(reader, nrows=0).columns
+        usecols = [column for column in columns if column in header]
+        options = dict(
+            usecols=usecols, dtype=quote_dtypes(usecols, compact=compact), engine="c"
+        )
+        if chunk_size is None:
+            with self._open(file_path) as reader:
+                return read_csv(reader, **options)
+        return self._read_chunks(file_path, chunk_size, options)
+
+    def _read_chunks(
+        self, file_path: Path, chunk_size: int, options: dict[str, Any]
+    ) -> Iterator[DataFrame]:
+        with self._open(file_path) as reader:
+            yield from read_csv(reader, chunksize=chunk_size, **options)
+
+    def _open(self, file_path: Path, mode: str = "rt"):
+        # Plain files may still be read until their next write converts them.
+        return open_compressed(
+            file_path, mode, compression_of(file_path), self._config.compression_level
+        )
+
+    def _save_csv(self, new_data: DataFrame, file_name: Path):
+        exists = file_name.exists()
+        with self._open(file_name, "at") as writer:
+            new_data.to_csv(writer, index=False, header=not exists)
+
+    @staticmethod
+    def _truncate(file_path: Path, size: Optional[int]):
+        # Appended gzip members / zstd frames are dropped whole.
+        if size is None:
+            file_path.unlink(missing_ok=True)
+        else:
+            os.truncate(file_path, size)
+
+    def _build_records(
+        self, data: DataFrame, pair: Pair, time_unit: TimeUnits
+    ) -> Iterator[dict[str, Any]]:
+        return (
+            quote.to_dict()
+            for quote in self._quote_factory.build_from_dataframe(data, pair, time_unit)
+        )
+
+    @staticmethod
+    def _temporary(file_path: Path) -> Path:
+        return file_path.with_name(f".{file_path.name}.tmp")
+
+    def _convert(self, pair: Pair, time_unit: TimeUnits):
+        # Files written before compression was enabled are converted by the
+        # next write, readers never modify the storage.
+        for file_path in (
+            self._csv_file(pair, time_unit),
+            self._json_file(pair, time_unit),
+        ):
+            path = compressed_path(file_path, self._config.compression)
+            if path == file_path or not file_path.exists():
+                continue
+            with file_lock(self.locks_folder / f"{file_path.name}.lock"):
+                if not path.exists():
+                    recompress(
+                        file_path,
+                        path,
+                        self._config.compression,
+                        self._config.compression_level,
+                    )
+                file_path.unlink(missing_ok=True)
+
+    def _locate(self, file_path: Path) -> Path:
+        path = compressed_path(file_path, self._config.compression)
+        if path != file_path and not path.exists() and file_path.exists():
+            return file_path
+        return path
+
+    def _csv_file(self, pair: Pair, time_unit: TimeUnits) -> Path:
+        return self.csv_folder / f"{pair.symbol}-{time_unit.value}-data.csv"
+
+    def _json_file(self, pair: Pair, time_unit: TimeUnits) -> Path:
+        return self.json_folder / f"{pair.symbol}-{time_unit.value}-data.json"
+
+    def get_csv_name_for_pair(self, pair: Pair, time_unit: TimeUnits) -> Path:
+        return self._locate(self._csv_file(pair, time_unit))
+
+    def get_journal_file(self, pair: Pair, time_unit: TimeUnits) -> Path:
+        return self.locks_folder / f"{pair.symbol}-{time_unit.value}.journal"
+
+    def get_json_name_for_pair(self, pair: Pair, time_unit: TimeUnits) -> Path:
+        return self._locate(self._json_file(pair, time_unit))
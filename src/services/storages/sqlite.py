@@ -0,0 +1,245 @@
+import sqlite3
+import threading
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from injector import singleton, inject
+from pandas import DataFrame, read_sql_query
+
+from models.enums import TimeUnits
+from models.pair import Pair
+from models.schema import KLINE_COLUMNS, QUOTE_COLUMNS, quote_dtypes
+from services.factories.quote_pair import QuotesFactory
+from services.storages.base import QuotesStorage
+from utils.etc import create_folder_and_parents
+
+SQLITE_COLUMNS = [column for column in KLINE_COLUMNS if column != "ignore"]
+
+SQLITE_TYPES = {"timestamp": "INTEGER", "close_time": "INTEGER", "trades": "INTEGER"}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS quotes (
+    symbol TEXT NOT NULL,
+    time_unit TEXT NOT NULL,
+    {", ".join(f"{column} {SQLITE_TYPES.get(column, 'REAL')}" for column in SQLITE_COLUMNS)},
+    PRIMARY KEY (symbol, time_unit, timestamp)
+) WITHOUT ROWID
+"""
+
+# Write counter of every series, so that readers can tell it changed without scanning it.
+VERSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series_versions (
+    symbol TEXT NOT NULL,
+    time_unit TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (symbol, time_unit)
+) WITHOUT ROWID
+"""
+
+
+def _batches(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@singleton
+class SqliteQuotesStorage(QuotesStorage):
+    @dataclass
+    class Configuration:
+        database_path: Path
+        batch_size: int = 5000
+        columns: Optional[list[str]] = None
+        compact: bool = False
+
+    @inject
+    def __init__(self, configuration: Configuration, quote_factory: QuotesFactory):
+        self._config = configuration
+        self._quote_factory = quote_factory
+        self._local = threading.local()
+
+        create_folder_and_parents(self._config.database_path.parent)
+        with self.connection:
+            self.connection.execute(SCHEMA)
+            self.connection.execute(VERSIONS_SCHEMA)
+
+    @property
+    def location(self) -> str:
+        return str(self._config.database_path.absolute())
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._config.database_path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def load_quotes(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        columns: Optional[list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> DataFrame:
+        columns, query, params = self._select(pair, time_unit, columns, start, end)
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        data = read_sql_query(query, self.connection, params=params)
+        if data.empty:
+            return DataFrame()
+        return data.astype(quote_dtypes(columns, compact=self._config.compact))
+
+    def iter_quotes(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        columns: Optional[list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: int = 100000,
+    ) -> Iterator[DataFrame]:
+        columns, query, params = self._select(pair, time_unit, columns, start, end)
+        dtypes = quote_dtypes(columns, compact=self._config.compact)
+        for chunk in read_sql_query(
+            query, self.connection, params=params, chunksize=chunk_size
+        ):
+            yield chunk.astype(dtypes)
+
+    def _select(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        columns: Optional[list[str]],
+        start: Optional[int],
+        end: Optional[int],
+    ) -> tuple[list[str], str, list[Any]]:
+        columns = columns or self._config.columns or QUOTE_COLUMNS
+        columns = [column for column in columns if column in SQLITE_COLUMNS]
+        if "timestamp" not in columns:
+            columns = ["timestamp", *columns]
+
+        query = f"SELECT {', '.join(columns)} FROM quotes WHERE symbol = ? AND time_unit = ?"
+        params: list[Any] = [pair.symbol, time_unit.value]
+        if start is not None:
+            query += " AND timestamp >= ?"
+            params.append(int(start))
+        if end is not None:
+            query += " AND timestamp <= ?"
+            params.append(int(end))
+        query += " ORDER BY timestamp"
+        return columns, query, params
+
+    def load_raw_quotes(
+        self, pair: Pair, time_unit: TimeUnits, columns: list[str]
+    ) -> DataFrame:
+        # Columns have a type affinity only: any value may have been stored.
+        columns, query, params = self._select(pair, time_unit, columns, None, None)
+        return read_sql_query(query, self.connection, params=params)
+
+    def save_quotes(
+        self,
+        pair: Pair,
+        time_unit: TimeUnits,
+        pages: Iterable[DataFrame],
+        on_commit: Optional[Callable[[], None]] = None,
+    ) -> int:
+        saved = 0
+        for page in pages:
+            with self.connection:
+                self._insert(pair, time_unit, page)
+                self._bump_version(pair, time_unit)
+            saved += len(page)
+            if on_commit is not None:
+                on_commit()
+        return saved
+
+    def replace_quotes(self, pair: Pair, time_unit: TimeUnits, data: DataFrame) -> None:
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM quotes WHERE symbol = ? AND time_unit = ?",
+                (pair.symbol, time_unit.value),
+            )
+            self._insert(pair, time_unit, data)
+            self._bump_version(pair, time_unit)
+
+    def _bump_version(self, pair: Pair, time_unit: TimeUnits):
+        params = (pair.symbol, time_unit.value)
+        self.connection.execute(
+            "INSERT OR IGNORE INTO series_versions (symbol, time_unit, version) VALUES (?, ?, 0)",
+            params,
+        )
+        self.connection.execute(
+            "UPDATE series_versions SET version = version + 1 WHERE symbol = ? AND time_unit = ?",
+            params,
+        )
+
+    def _insert(self, pair: Pair, time_unit: TimeUnits, data: DataFrame):
+        columns = [column for column in SQLITE_COLUMNS if column in data.columns]
+        statement = (
+            f"INSERT OR IGNORE INTO quotes (symbol, time_unit, {', '.join(columns)}) "
+            f"VALUES (?, ?, {', '.join('?' for _ in columns)})"
+        )
+        rows = (
+            (pair.symbol, time_unit.value, *row)
+            for row in data[columns].itertuples(index=False, name=None)
+        )
+        for batch in _batches(rows, self._config.batch_size):
+            self.connection.executemany(statement, batch)
+
+    def has_quotes(self, pair: Pair, time_unit: TimeUnits) -> bool:
+        cursor = self.connection.execute(
+            "SELECT 1 FROM quotes WHERE symbol = ? AND time_unit = ? LIMIT 1",
+            (pair.symbol, time_unit.value),
+        )
+        return cursor.fetchone() is not None
+
+    def get_quotes(self, pair: Pair, time_unit: TimeUnits) -> list[dict[str, Any]]:
+        data = self.load_quotes(pair, time_unit, columns=QUOTE_COLUMNS)
+        if data.empty:
+            return []
+        return [
+            quote.to_dict()
+            for quote in self._quote_factory.build_from_dataframe(data, pair, time_unit)
+        ]
+
+    def available_time_units(self) -> list[TimeUnits]:
+        cursor = self.connection.execute("SELECT DISTINCT time_unit FROM quotes")
+        return [TimeUnits.from_code(code) for code, in cursor.fetchall()]
+
+    def last_timestamp(self, pair: Pair, time_unit: TimeUnits) -> Optional[int]:
+        cursor = self.connection.execute(
+            "SELECT MAX(timestamp) FROM quotes WHERE symbol = ? AND time_unit = ?",
+            (pair.symbol, time_unit.value),
+        )
+        return cursor.fetchone()[0]
+
+    def series_size(self, pair: Pair, time_unit: TimeUnits) -> Optional[int]:
+        return None
+
+    def available_series(self) -> list[tuple[str, TimeUnits]]:
+        cursor = self.connection.execute(
+            "SELECT DISTINCT symbol, time_unit FROM quotes"
+        )
+        return [
+            (symbol, TimeUnits.from_code(code)) for symbol, code in cursor.fetchall()
+        ]
+
+    def series_version(self, pair: Pair, time_unit: TimeUnits) -> Optional[tuple]:
+        if not self.has_quotes(pair, time_unit):
+            return None
+        row = self.connection.execute(
+            "SELECT version FROM series_versions WHERE symbol = ? AND time_unit = ?",
+            (pair.symbol, time_unit.value),
+        ).fetchone()
+        # Series written before versions were tracked have none yet.
+        return (row[0] if row else 0,)
@@ -0,0 +1,258 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from injector import singleton, inject
+from pandas import DataFrame, to_numeric
+
+from models.enums import TimeUnits
+from models.pair import Pair
+from models.schema import KLINE_COLUMNS, QUOTE_COLUMNS, quote_dtypes
+from services.indicators import IndicatorsStage
+from services.manifest import QuotesManifest
+from services.panel import QuotesPanel
+from services.repositories.pair import PairsRepository
+from services.storages.base import QuotesStorage
+from utils.locks import series_lock
+
+logger = getLogger()
+
+# Checks whose failing rows are dropped by the repair mode.
+INVALID_ROW_CHECKS = (
+    "missing_timestamps",
+    "missing_values",
+    "high_below_low",
+    "open_outside_range",
+    "close_outside_range",
+    "negative_volume",
+)
+
+
+def parse_quotes(raw: DataFrame) -> tuple[DataFrame, np.ndarray]:
+    """
+    Convert the raw stored values to numbers. Cells which can't be parsed
+    become NaN, and their rows are flagged in the returned mask.
+    """
+    data = DataFrame(
+        {column: to_numeric(raw[column], errors="coerce") for column in raw.columns}
+    )
+    unparsable = (data.isna() & raw.notna()).any(axis=1).to_numpy()
+    return data, unparsable
+
+
+def check_quotes(data: DataFrame, time_unit: TimeUnits) -> dict[str, np.ndarray]:
+    """
+    Return, for every check, a boolean mask of the rows failing it.
+    """
+    timestamps = data["timestamp"].to_numpy()
+    open_, high, low, close, volume = (
+        data[column].to_numpy(dtype="float64")
+        for column in ("open", "high", "low", "close", "volume")
+    )
+
+    order = np.argsort(timestamps, kind="stable")
+    sorted_timestamps = timestamps[order]
+    duplicated = np.empty(len(timestamps), dtype=bool)
+    duplicated[order] = np.concatenate(
+        [[False], sorted_timestamps[1:] == sorted_timestamps[:-1]]
+    )[: len(timestamps)]
+
+    masks = {
+        "missing_timestamps": data["timestamp"].isna().to_numpy(),
+        "duplicate_timestamps": duplicated,
+        "non_monotonic_timestamps": np.concatenate([[False], np.diff(timestamps) < 0])[
+            : len(timestamps)
+        ],
+        "missing_values": np.isnan(np.stack([open_, high, low, close, volume])).any(
+            axis=0
+        ),
+        "high_below_low": high < low,
+        "open_outside_range": (open_ > high) | (open_ < low),
+        "close_outside_range": (close > high) | (close < low),
+        "negative_volume": volume < 0,
+    }
+    if time_unit.milliseconds is not None and "close_time" in data:
+        expected = timestamps + time_unit.milliseconds - 1
+        masks["close_time_mismatch"] = data["close_time"].to_numpy() != expected
+    return masks
+
+
+def repair_quotes(data: DataFrame, time_unit: TimeUnits) -> DataFrame:
+    """
+    Sort by timestamp, keep the last download of duplicated candles, drop
+    inconsistent rows and recompute ``close_time`` from the interval. The
+    result has the stored dtypes again.
+    """
+    data = data.sort_values("timestamp", kind="stable")
+    data = data[~data["timestamp"].duplicated(keep="last")]
+    masks = check_quotes(data, time_unit)
+    invalid = np.zeros(len(data), dtype=bool)
+    for check in INVALID_ROW_CHECKS:
+        invalid |= masks[check]
+    data = data[~invalid].copy()
+    if time_unit.milliseconds is not None and "close_time" in data:
+        data["close_time"] = data["timestamp"] + time_unit.milliseconds - 1
+    # Monthly close times can't be recomputed.
+    data = data.dropna(subset=[column for column in ("close_time",) if column in data])
+    if "trades" in data:
+        # Unknown trade counts are stored as 0, as for Crypto.com candles.
+        data["trades"] = data["trades"].fillna(0)
+    return data.astype(quote_dtypes(list(data.columns))).reset_index(drop=True)
+
+
+def _verify_series(symbol: str, time_unit: str, repair: bool) -> dict[str, Any]:
+    from utils.service_provider import provide
+
+    return provide(QuotesVerifier).verify(
+        symbol, TimeUnits.from_code(time_unit), repair
+    )
+
+
+@singleton
+class QuotesVerifier:
+    @dataclass
+    class Configuration:
+        file_folder_path: Path
+        samples: int = 5
+
+    @inject
+    def __init__(
+        self,
+        configuration: Configuration,
+        storage: QuotesStorage,
+        manifest: QuotesManifest,
+        indicators: IndicatorsStage,
+        panel: QuotesPanel,
+        pairs_repository: PairsRepository,
+    ):
+        self._config = configuration
+        self._storage = storage
+        self._manifest = manifest
+        self._indicators = indicators
+        self._panel = panel
+        self._pairs_repository = pairs_repository
+
+    @property
+    def locks_folder(self) -> Path:
+        return self._config.file_folder_path / "locks"
+
+    def verify(
+        self, symbol: str, time_unit: TimeUnits, repair: bool = False
+    ) -> dict[str, Any]:
+        # A repair rewrites the whole series: imports must not append to it meanwhile.
+        lock = (
+            series_lock(self.locks_folder, symbol, time_unit.value)
+            if repair
+            else nullcontext()
+        )
+        try:
+            with lock:
+                return self._verify(symbol, time_unit, repair)
+        except Exception as e:
+            # The other series are still verified.
+            logger.error(f"[VERIFY] {symbol} // {time_unit.value} failed: {e}")
+            return {
+                "symbol": symbol,
+                "time_unit": time_unit.value,
+                "rows": 0,
+                "issues": {},
+                "samples": {},
+                "error": str(e),
+            }
+
+    def _verify(
+        self, symbol: str, time_unit: TimeUnits, repair: bool
+    ) -> dict[str, Any]:
+        pair = Pair.from_symbol(symbol)
+        data, unparsable = self._load(pair, time_unit)
+        report: dict[str, Any] = {
+            "symbol": symbol,
+            "time_unit": time_unit.value,
+            "rows": len(data),
+            "issues": {},
+            "samples": {},
+        }
+        if len(data) == 0:
+            return report
+
+        masks = {"unparsable_values": unparsable, **check_quotes(data, time_unit)}
+        timestamps = data["timestamp"].to_numpy(dtype="float64")
+        for check, mask in masks.items():
+            count = int(mask.sum())
+            if count:
+                report["issues"][check] = count
+                report["samples"][check] = [
+                    None if np.isnan(timestamp) else int(timestamp)
+                    for timestamp in timestamps[mask][: self._config.samples]
+                ]
+
+        if repair and report["issues"]:
+            # Every stored column is kept, at full precision.
+            data, unparsable = self._load_raw(pair, time_unit)
+            repaired = repair_quotes(data[~unparsable], time_unit)
+            pair = self._repaired_pair(pair, time_unit)
+            self._storage.replace_quotes(pair, time_unit, repaired)
+            self._manifest.replace(
+                symbol,
+                time_unit,
+                [repaired],
+                self._storage.series_size(pair, time_unit),
+            )
+            # Derived data may hold removed rows.
+            self._indicators.reset(pair, time_unit)
+            self._panel.replace_series(symbol, time_unit)
+            report["removed_rows"] = len(data) - len(repaired)
+            report["repaired"] = True
+            logger.info(f"[VERIFY] {symbol} // {time_unit.value} repaired")
+        return report
+
+    def _load(self, pair: Pair, time_unit: TimeUnits) -> tuple[DataFrame, np.ndarray]:
+        # Only series which can't be read with their dtypes are read as
+        # strings, so that corrupt cells are reported instead of failing the read.
+        try:
+            data = self._storage.load_quotes(pair, time_unit, columns=QUOTE_COLUMNS)
+        except (ValueError, TypeError):
+            return self._load_raw(pair, time_unit, QUOTE_COLUMNS)
+        return data, np.zeros(len(data), dtype=bool)
+
+    def _load_raw(
+        self, pair: Pair, time_unit: TimeUnits, columns: list[str] = KLINE_COLUMNS
+    ) -> tuple[DataFrame, np.ndarray]:
+        return parse_quotes(
+            self._storage.load_raw_quotes(pair, time_unit, columns=columns)
+        )
+
+    def _repaired_pair(self, pair: Pair, time_unit: TimeUnits) -> Pair:
+        # Rewritten quotes keep the pair metadata they were stored with.
+        return (
+            self._pairs_repository.find_stored_pair(pair.symbol)
+            or self._storage.stored_pair(pair, time_unit)
+            or pair
+        )
+
+    def verify_all(
+        self,
+        series: Optional[list[tuple[str, TimeUnits]]] = None,
+        workers: Optional[int] = None,
+        repair: bool = False,
+    ) -> list[dict[str, Any]]:
+        series = self._storage.available_series() if series is None else series
+        if workers == 1:
+            return [
+                self.verify(symbol, time_unit, repair) for symbol, time_unit in series
+            ]
+
+        # Spawned workers build their own storage instead of inheriting open handles.
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [
+                executor.submit(_verify_series, symbol, time_unit.value, repair)
+                for symbol, time_unit in series
+            ]
+            return [future.result() for future in futures]
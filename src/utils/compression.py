@@ -0,0 +1,94 @@
+import gzip
+import io
+import os
+import shutil
+import zlib
+from pathlib import Path
+from typing import IO, Optional
+
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+try:
+    from zstandard import ZstdError
+except ImportError:
+    ZstdError = zlib.error
+
+# Raised when reading a truncated or corrupted compressed file.
+DECOMPRESSION_ERRORS = (EOFError, zlib.error, ZstdError)
+
+
+def compressed_path(path: Path, compression: Optional[str]) -> Path:
+    return path.with_name(path.name + COMPRESSION_SUFFIXES[compression])
+
+
+def compression_of(path: Path) -> Optional[str]:
+    # Temporary names keep the suffix of their file, e.g. ".name.csv.gz.tmp".
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if suffix and suffix in path.suffixes:
+            return compression
+    return None
+
+
+def open_compressed(
+    path: Path,
+    mode: str = "rt",
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+) -> IO:
+    """
+    Open ``path`` for streaming reads, writes or appends, transparently
+    (de)compressing with gzip or zstd. Appending adds a new gzip member or
+    zstd frame, both of which are read back as a single stream.
+    """
+    if compression is None:
+        return open(path, mode)
+
+    level = DEFAULT_LEVELS[compression] if level is None else level
+    if compression == "gzip":
+        return gzip.open(path, mode, compresslevel=level)
+    if compression == "zstd":
+        return _open_zstd(path, mode, level)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def _open_zstd(path: Path, mode: str, level: int) -> IO:
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires the 'zstandard' package") from None
+
+    raw = open(path, mode.replace("t", "") + ("b" if "b" not in mode else ""))
+    if "r" in mode:
+        stream = zstandard.ZstdDecompressor().stream_reader(
+            raw, read_across_frames=True
+        )
+        stream = io.BufferedReader(stream)
+    else:
+        stream = zstandard.ZstdCompressor(level=level).stream_writer(raw)
+    if "b" in mode:
+        return stream
+    return io.TextIOWrapper(stream, encoding="utf-8")
+
+
+def recompress(
+    source: Path,
+    destination: Path,
+    compression: Optional[str],
+    level: Optional[int] = None,
+):
+    """
+    Write a compressed copy of ``source`` to ``destination``. The copy is
+    moved into place once complete, so an interrupted conversion never
+    leaves a truncated ``destination``.
+    """
+    temporary = destination.with_name(f".{destination.name}.recompress")
+    try:
+        with (
+            open(source, "rb") as reader,
+            open_compressed(temporary, "wb", compression, level) as writer,
+        ):
+            shutil.copyfileobj(reader, writer)
+        os.replace(temporary, destination)
+    finally:
+        temporary.unlink(missing_ok=True)
@@ -1,6 +1,24 @@
-from pathlib import Path
-
-
-def create_folder_and_parents(path: Path):
-    if not path.exists():
-        return path.mkdir(parents=True)
+from pathlib import Path
+from typing import Optional, Union
+
+from binance.helpers import date_to_milliseconds
+
+
+def create_folder_and_parents(path: Path):
+    if not path.exists():
+        return path.mkdir(parents=True)
+
+
+def to_milliseconds(value: Optional[Union[str, int]]) -> Optional[int]:
+    """
+    Convert an epoch in milliseconds or any date understood by dateparser
+    (e.g. "1 Jan 2021", "2021-01-01 12:00 UTC") to epoch milliseconds.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    if value.isdigit():
+        return int(value)
+    try:
+        return int(date_to_milliseconds(value))
+    except Exception:
+        raise ValueError(f"Invalid date: {value}") from None
@@ -0,0 +1,34 @@
+import fcntl
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold an advisory ``flock`` on ``path`` (created if needed) for the
+    duration of the block. Yields ``False`` instead of waiting when the lock
+    is taken and ``blocking`` is disabled.
+    """
+    with open(path, "a") as lock_file:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(lock_file, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def series_lock(locks_folder: Path, symbol: str, time_unit: str, blocking: bool = True):
+    """
+    ``file_lock`` of a stored series, held by every process writing it
+    (imports, repairs) so that they never interleave.
+    """
+    # Several processes may create the folder at once.
+    locks_folder.mkdir(parents=True, exist_ok=True)
+    return file_lock(locks_folder / f"{symbol}-{time_unit}.lock", blocking)
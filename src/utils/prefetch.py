@@ -0,0 +1,63 @@
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Producer(threading.Thread):
+    """
+    Thread iterating ``items`` into a bounded buffer, followed by ``_DONE``
+    and the error which stopped it, if any.
+    """
+
+    def __init__(self, items: Iterable[T], depth: int):
+        super().__init__(daemon=True)
+        self.buffer: queue.Queue = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self._items = items
+
+    def run(self):
+        try:
+            for item in self._items:
+                if not self._put((item, None)):
+                    return
+            self._put((_DONE, None))
+        except BaseException as e:
+            self._put((_DONE, e))
+
+    def _put(self, entry) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+def prefetch(items: Iterable[T], depth: int) -> Iterator[T]:
+    """
+    Iterate ``items`` from a background thread which keeps up to ``depth``
+    items ready, so that producing the next item (e.g. downloading a page)
+    overlaps with the consumer's work. Errors are re-raised to the consumer.
+    """
+    if depth <= 0:
+        yield from items
+        return
+
+    producer = _Producer(items, depth)
+    producer.start()
+    try:
+        while True:
+            item, error = producer.buffer.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        # Unblocks the producer if the consumer stops early.
+        producer.stopped.set()
@@ -10,6 +10,29 @@ T = TypeVar("T")
 
 _injector: Optional[Injector] = None
 data_folder = Path(os.getenv("CRYPTO_QUOTES_FOLDER", "/data"))
+quotes_columns = os.getenv("CRYPTO_QUOTES_COLUMNS")
+quotes_compact = os.getenv("CRYPTO_QUOTES_COMPACT", "0").lower() in ("1", "true", "yes")
+quotes_compression = os.getenv("CRYPTO_QUOTES_COMPRESSION") or None
+quotes_compression_level = os.getenv("CRYPTO_QUOTES_COMPRESSION_LEVEL")
+quotes_compression_level = (
+    int(quotes_compression_level) if quotes_compression_level else None
+)
+quotes_indicators = os.getenv("CRYPTO_QUOTES_INDICATORS")
+quotes_panel = os.getenv("CRYPTO_QUOTES_PANEL")
+quotes_weight_budget = os.getenv("CRYPTO_QUOTES_WEIGHT_BUDGET")
+quotes_weight_budget = int(quotes_weight_budget) if quotes_weight_budget else None
+quotes_prefetch_pages = int(os.getenv("CRYPTO_QUOTES_PREFETCH_PAGES", "2"))
+quotes_checkpoint_pages = int(os.getenv("CRYPTO_QUOTES_CHECKPOINT_PAGES", "50"))
+quotes_shard_partition = os.getenv("CRYPTO_QUOTES_SHARD_PARTITION")
+quotes_shard_partition = (
+    Path(quotes_shard_partition) if quotes_shard_partition else None
+)
+quotes_provider = os.getenv("CRYPTO_QUOTES_PROVIDER", "binance")
+quotes_routes = os.getenv("CRYPTO_QUOTES_ROUTES")
+quotes_backend = os.getenv("CRYPTO_QUOTES_BACKEND", "files")
+quotes_database = Path(
+    os.getenv("CRYPTO_QUOTES_DATABASE", str(data_folder / "quotes.sqlite3"))
+)
 
 
 def _configure_crypto_quots(binder: Binder):
@@ -27,6 +50,105 @@ def _configure_crypto_quots(binder: Binder):
         QuotesImporter.Configuration(file_folder_path=data_folder),
     )
 
+    from services.providers import QuotesProviders
+
+    binder.bind(
+        QuotesProviders.Configuration,
+        QuotesProviders.Configuration(
+            default=quotes_provider,
+            routes=quotes_routes.split(",") if quotes_routes else [],
+        ),
+    )
+
+    from services.sharding import PairsSharding
+
+    binder.bind(
+        PairsSharding.Configuration,
+        PairsSharding.Configuration(partition_file=quotes_shard_partition),
+    )
+
+    from services.quotes_storer import QuotesPairStorer
+
+    binder.bind(
+        QuotesPairStorer.Configuration,
+        QuotesPairStorer.Configuration(weight_budget=quotes_weight_budget),
+    )
+
+    from services.importers.parallel import ParallelQuotesImporter
+
+    binder.bind(
+        ParallelQuotesImporter.Configuration,
+        ParallelQuotesImporter.Configuration(prefetch_pages=quotes_prefetch_pages),
+    )
+
+    from services.cache import QuotesCache
+
+    binder.bind(QuotesCache.Configuration, QuotesCache.Configuration())
+
+    from services.exporters.quotes import QuotesExporter
+
+    binder.bind(QuotesExporter.Configuration, QuotesExporter.Configuration())
+
+    from services.verifier import QuotesVerifier
+
+    binder.bind(
+        QuotesVerifier.Configuration,
+        QuotesVerifier.Configuration(file_folder_path=data_folder),
+    )
+
+    from services.manifest import QuotesManifest
+
+    binder.bind(
+        QuotesManifest.Configuration,
+        QuotesManifest.Configuration(file_folder_path=data_folder),
+    )
+
+    from services.storages.base import QuotesStorage
+    from services.storages.files import FileQuotesStorage
+    from services.storages.sqlite import SqliteQuotesStorage
+
+    columns = quotes_columns.split(",") if quotes_columns else None
+    binder.bind(
+        FileQuotesStorage.Configuration,
+        FileQuotesStorage.Configuration(
+            file_folder_path=data_folder,
+            columns=columns,
+            compact=quotes_compact,
+            compression=quotes_compression,
+            compression_level=quotes_compression_level,
+            json_indent=None if quotes_compression else 4,
+            checkpoint_pages=quotes_checkpoint_pages,
+        ),
+    )
+    binder.bind(
+        SqliteQuotesStorage.Configuration,
+        SqliteQuotesStorage.Configuration(
+            database_path=quotes_database, columns=columns, compact=quotes_compact
+        ),
+    )
+    from services.indicators import IndicatorsStage
+
+    binder.bind(
+        IndicatorsStage.Configuration,
+        IndicatorsStage.Configuration(
+            file_folder_path=data_folder,
+            indicators=quotes_indicators.split(",") if quotes_indicators else [],
+        ),
+    )
+
+    from services.panel import QuotesPanel
+
+    binder.bind(
+        QuotesPanel.Configuration,
+        QuotesPanel.Configuration(
+            file_folder_path=data_folder,
+            fields=quotes_panel.split(",") if quotes_panel else [],
+        ),
+    )
+
+    storages = {"files": FileQuotesStorage, "sqlite": SqliteQuotesStorage}
+    binder.bind(QuotesStorage, to=storages[quotes_backend])
+
 
 def _configure_crypto_pairs(binder: Binder):
     from services.repositories.pair import PairsRepository
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pandas import DataFrame
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from models.pair import Pair  # noqa: E402
+from models.schema import KLINE_COLUMNS, quote_dtypes  # noqa: E402
+
+MINUTE = 60 * 1000
+
+
+def build_page(start: int, rows: int = 5) -> DataFrame:
+    """
+    Page of 1m klines starting at minute ``start``, with prices derived
+    from the minute so that every candle differs.
+    """
+    minutes = np.arange(start, start + rows)
+    close = 100 + np.sin(minutes / 7) * 10
+    data = {column: np.ones(rows) for column in KLINE_COLUMNS}
+    data.update(
+        timestamp=minutes * MINUTE,
+        open=close - 0.5,
+        high=close + 1,
+        low=close - 1,
+        close=close,
+        volume=minutes % 13 + 1.0,
+        close_time=minutes * MINUTE + MINUTE - 1,
+    )
+    return DataFrame(data).astype(quote_dtypes(KLINE_COLUMNS))
+
+
+@pytest.fixture
+def pair() -> Pair:
+    return Pair("ABCUSDT", "ABC", "USDT")
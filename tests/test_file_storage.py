@@ -0,0 +1,142 @@
+import multiprocessing
+import os
+
+import pytest
+
+from conftest import MINUTE, build_page
+from models.enums import TimeUnits
+from services.factories.quote_pair import QuotesFactory
+from services.storages.files import FileQuotesStorage
+
+TIME_UNIT = TimeUnits.minutes1
+
+
+def build_storage(folder, compression=None, checkpoint_pages=3):
+    return FileQuotesStorage(
+        FileQuotesStorage.Configuration(
+            folder, compression=compression, checkpoint_pages=checkpoint_pages
+        ),
+        QuotesFactory(),
+    )
+
+
+def pages(first, count, fail_at=None):
+    for index in range(first, first + count):
+        if index == fail_at:
+            raise RuntimeError("download failed")
+        yield build_page(index * 5)
+
+
+def json_minutes(storage, pair):
+    return [
+        int(quote["timestamp"]) // MINUTE
+        for quote in storage.get_quotes(pair, TIME_UNIT)
+    ]
+
+
+def csv_minutes(storage, pair):
+    data = storage.load_quotes(pair, TIME_UNIT)
+    return [] if data.empty else list(data["timestamp"] // MINUTE)
+
+
+@pytest.fixture(params=[None, "gzip"])
+def storage(request, tmp_path):
+    return build_storage(tmp_path, compression=request.param)
+
+
+def test_json_lists_each_import_in_order_newest_import_first(storage, pair):
+    assert storage.save_quotes(pair, TIME_UNIT, pages(0, 8)) == 40
+    assert storage.save_quotes(pair, TIME_UNIT, pages(8, 2)) == 10
+    assert json_minutes(storage, pair) == list(range(40, 50)) + list(range(40))
+    assert csv_minutes(storage, pair) == list(range(50))
+
+
+def test_failure_rolls_back_to_the_last_checkpoint(storage, pair):
+    storage.save_quotes(pair, TIME_UNIT, pages(0, 2))
+    commits = []
+    with pytest.raises(RuntimeError):
+        storage.save_quotes(
+            pair,
+            TIME_UNIT,
+            pages(2, 10, fail_at=7),
+            on_commit=lambda: commits.append(len(csv_minutes(storage, pair))),
+        )
+    # Pages 2 to 4 made a checkpoint, pages 5 and 6 were dropped.
+    assert commits == [25]
+    assert csv_minutes(storage, pair) == list(range(25))
+    assert sorted(json_minutes(storage, pair)) == list(range(25))
+    assert not storage.get_journal_file(pair, TIME_UNIT).exists()
+
+    storage.save_quotes(pair, TIME_UNIT, pages(5, 2))
+    assert csv_minutes(storage, pair) == list(range(35))
+    assert sorted(json_minutes(storage, pair)) == list(range(35))
+
+
+def test_failure_before_a_checkpoint_keeps_nothing(storage, pair):
+    storage.save_quotes(pair, TIME_UNIT, pages(0, 2))
+    with pytest.raises(RuntimeError):
+        storage.save_quotes(pair, TIME_UNIT, pages(2, 5, fail_at=4))
+    assert csv_minutes(storage, pair) == list(range(10))
+    assert json_minutes(storage, pair) == list(range(10))
+
+
+def _killed_save(folder, compression, pair):
+    storage = build_storage(folder, compression=compression)
+
+    def killed():
+        yield from pages(2, 5)
+        os._exit(1)
+
+    storage.save_quotes(pair, TIME_UNIT, killed())
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_killed_save_is_recovered(tmp_path, pair, compression):
+    storage = build_storage(tmp_path, compression=compression)
+    storage.save_quotes(pair, TIME_UNIT, pages(0, 2))
+    process = multiprocessing.get_context("fork").Process(
+        target=_killed_save, args=(tmp_path, compression, pair)
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 1
+    assert len(csv_minutes(storage, pair)) == 35
+
+    assert storage.recover(pair, TIME_UNIT)
+    assert csv_minutes(storage, pair) == list(range(25))
+    assert json_minutes(storage, pair) == list(range(10, 25)) + list(range(10))
+    assert not storage.recover(pair, TIME_UNIT)
+
+
+def test_completed_save_is_not_rolled_back(storage, pair):
+    storage.save_quotes(pair, TIME_UNIT, pages(0, 4))
+    # As left by a process killed right after replacing the JSON file.
+    journal = {
+        "csv_size": None,
+        "checkpoint_size": None,
+        "first_timestamp": 0,
+        "json": None,
+        "pages": 3,
+        "rows": 15,
+    }
+    storage._save_journal(pair, TIME_UNIT, journal)
+    assert storage.recover(pair, TIME_UNIT)
+    assert csv_minutes(storage, pair) == list(range(20))
+    assert json_minutes(storage, pair) == list(range(20))
+
+
+def test_plain_files_are_read_as_is_and_converted_by_the_next_save(tmp_path, pair):
+    build_storage(tmp_path).save_quotes(pair, TIME_UNIT, pages(0, 2))
+    storage = build_storage(tmp_path, compression="gzip")
+    csv_file = storage.get_csv_name_for_pair(pair, TIME_UNIT)
+
+    assert csv_file.suffix == ".csv"
+    assert csv_minutes(storage, pair) == list(range(10))
+    assert storage.series_version(pair, TIME_UNIT) is not None
+    assert csv_file.exists()
+
+    storage.save_quotes(pair, TIME_UNIT, pages(2, 1))
+    assert not csv_file.exists()
+    assert storage.get_csv_name_for_pair(pair, TIME_UNIT).suffix == ".gz"
+    assert csv_minutes(storage, pair) == list(range(15))
+    assert json_minutes(storage, pair) == list(range(10, 15)) + list(range(10))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from pandas import concat, read_csv
+
+from conftest import build_page
+from models.enums import TimeUnits
+from services.factories.quote_pair import QuotesFactory
+from services.indicators import IndicatorsStage, build_indicator
+from services.storages.files import FileQuotesStorage
+
+TIME_UNIT = TimeUnits.minutes1
+SPECS = ["sma_5", "ema_10", "rsi_14", "atr_14"]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return FileQuotesStorage(FileQuotesStorage.Configuration(tmp_path), QuotesFactory())
+
+
+@pytest.mark.parametrize("spec", SPECS)
+@pytest.mark.parametrize("chunk_size", [1, 7, 30])
+def test_incremental_compute_matches_full_compute(spec, chunk_size):
+    data = build_page(0, 120)
+    expected, _ = build_indicator(spec).compute(data, {})
+
+    indicator, state, values = build_indicator(spec), {}, []
+    for start in range(0, len(data), chunk_size):
+        chunk_values, state = indicator.compute(
+            data.iloc[start : start + chunk_size], state
+        )
+        values.append(chunk_values)
+    np.testing.assert_allclose(np.concatenate(values), expected, equal_nan=True)
+
+
+def test_stage_updates_match_a_full_recompute(tmp_path, storage, pair):
+    incremental = IndicatorsStage(
+        IndicatorsStage.Configuration(tmp_path / "a", SPECS), storage
+    )
+    full = IndicatorsStage(
+        IndicatorsStage.Configuration(tmp_path / "b", SPECS), storage
+    )
+    pages = [build_page(start, 10) for start in range(0, 100, 10)]
+    for page in pages:
+        storage.save_quotes(pair, TIME_UNIT, [page])
+        incremental.update(pair, TIME_UNIT, page)
+    full.update(pair, TIME_UNIT, concat(pages))
+
+    result = read_csv(incremental.get_data_file(pair, TIME_UNIT))
+    expected = read_csv(full.get_data_file(pair, TIME_UNIT))
+    assert len(result) == 100
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), equal_nan=True)
+
+
+def test_stage_fills_gaps_from_the_storage(tmp_path, storage, pair):
+    stage = IndicatorsStage(IndicatorsStage.Configuration(tmp_path, ["sma_3"]), storage)
+    first, skipped, last = build_page(0, 10), build_page(10, 10), build_page(20, 10)
+    storage.save_quotes(pair, TIME_UNIT, [first])
+    stage.update(pair, TIME_UNIT, first)
+    # The rows of ``skipped`` were imported without the stage.
+    storage.save_quotes(pair, TIME_UNIT, [skipped, last])
+    assert stage.update(pair, TIME_UNIT, last) == 20
+    result = read_csv(stage.get_data_file(pair, TIME_UNIT))
+    assert list(result["timestamp"]) == list(
+        concat([first, skipped, last])["timestamp"]
+    )
@@ -0,0 +1,50 @@
+import io
+import json
+
+import pytest
+
+from services.storages.files import _JsonArrayWriter
+
+
+def write(records, indent, existing=None):
+    buffer = io.StringIO()
+    writer = _JsonArrayWriter(buffer, indent)
+    writer.write(records)
+    if existing is not None:
+        writer.copy(io.StringIO(existing))
+    writer.close()
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_write_matches_json_dumps(indent):
+    records = [{"timestamp": str(i), "close": i / 3} for i in range(3)]
+    assert write(records, indent) == json.dumps(records, indent=indent)
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_write_nothing(indent):
+    assert write([], indent) == json.dumps([], indent=indent)
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_copy_prepends_new_records(indent, monkeypatch):
+    # Small chunks make items straddle several reads.
+    monkeypatch.setattr(_JsonArrayWriter, "COPY_CHUNK_SIZE", 7)
+    existing = [{"timestamp": str(i), "pair": {"symbol": "ABC"}} for i in range(5)]
+    new = [{"timestamp": str(i), "pair": {"symbol": "ABC"}} for i in range(5, 8)]
+    text = write(new, indent, json.dumps(existing, indent=indent))
+    assert text == json.dumps(new + existing, indent=indent)
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_copy_into_empty_writer(indent):
+    existing = [{"timestamp": "1"}, {"timestamp": "2"}]
+    text = write([], indent, json.dumps(existing, indent=indent))
+    assert json.loads(text) == existing
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_copy_empty_array(indent):
+    new = [{"timestamp": "1"}]
+    assert json.loads(write(new, indent, json.dumps([], indent=indent))) == new
@@ -0,0 +1,80 @@
+import json
+
+from services.factories.pair import PairFactory
+from services.importers.pairs_importer import PairsImporter
+
+
+class FakeClient:
+    def get_available_instruments(self):
+        return {
+            "instruments": [
+                {
+                    "instrument_name": "ABC_USDT",
+                    "base_currency": "ABC",
+                    "quote_currency": "USDT",
+                },
+                {
+                    "instrument_name": "DEF_BTC",
+                    "base_currency": "DEF",
+                    "quote_currency": "BTC",
+                },
+            ]
+        }
+
+
+class FakeExchange:
+    def __init__(self, activity):
+        self.activity = activity
+
+    def get_activity(self):
+        return self.activity
+
+
+class FakeProviders:
+    def __init__(self):
+        self.exchanges = {
+            "cryptocom": FakeExchange({"ABCUSDT": (1000.0, None)}),
+            "binance": FakeExchange({"DEFBTC": (2.5, 300)}),
+        }
+
+    def name_for(self, pair):
+        return "cryptocom" if pair.symbol.endswith("USDT") else "binance"
+
+    def get(self, name):
+        return self.exchanges[name]
+
+
+def build_importer(folder):
+    return PairsImporter(
+        PairsImporter.Configuration(folder),
+        FakeClient(),
+        PairFactory(),
+        FakeProviders(),
+    )
+
+
+def test_pairs_file_is_replaced_whole(tmp_path):
+    importer = build_importer(tmp_path)
+    importer.pair_file_path.write_text("[{")
+
+    pairs = importer.import_all_pairs()
+
+    stored = json.loads(importer.pair_file_path.read_text())
+    assert (
+        [pair["symbol"] for pair in stored]
+        == ["ABCUSDT", "DEFBTC"]
+        == [pair.symbol for pair in pairs]
+    )
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        ".available_pairs.lock",
+        "available_pairs.json",
+    ]
+
+
+def test_activity_comes_from_the_provider_of_each_pair(tmp_path):
+    pairs = build_importer(tmp_path).import_all_pairs()
+
+    assert [(pair.volume_24h, pair.trades_24h) for pair in pairs] == [
+        (1000.0, None),
+        (2.5, 300),
+    ]
@@ -0,0 +1,107 @@
+import pytest
+from pandas import read_csv
+
+from conftest import MINUTE, build_page
+from models.enums import TimeUnits
+from services.factories.quote_pair import QuotesFactory
+from services.importers.quotes import QuotesImporter
+from services.indicators import IndicatorsStage
+from services.manifest import QuotesManifest
+from services.panel import QuotesPanel
+from services.storages.files import FileQuotesStorage
+
+TIME_UNIT = TimeUnits.minutes1
+
+
+class FakeProvider:
+    def __init__(self, pages, fail_at=None):
+        self.pages = pages
+        self.fail_at = fail_at
+
+    def iter_needed_pair_quotes(self, pair, time_unit, last_timestamp):
+        first = 0 if last_timestamp is None else last_timestamp // MINUTE + 1
+        for index in range(self.pages):
+            if index == self.fail_at:
+                raise RuntimeError("download failed")
+            yield build_page(first + index * 5)
+
+
+class FakeProviders:
+    def __init__(self, provider):
+        self.provider = provider
+
+    def for_pair(self, pair):
+        return self.provider
+
+
+@pytest.fixture
+def services(tmp_path):
+    storage = FileQuotesStorage(
+        FileQuotesStorage.Configuration(tmp_path, checkpoint_pages=2), QuotesFactory()
+    )
+    manifest = QuotesManifest(QuotesManifest.Configuration(tmp_path))
+    indicators = IndicatorsStage(
+        IndicatorsStage.Configuration(tmp_path, ["sma_3"]), storage
+    )
+    panel = QuotesPanel(
+        QuotesPanel.Configuration(tmp_path, ["close"]), storage, manifest
+    )
+    return tmp_path, storage, manifest, indicators, panel
+
+
+def build_importer(services, provider):
+    folder, storage, manifest, indicators, panel = services
+    return QuotesImporter(
+        QuotesImporter.Configuration(folder),
+        FakeProviders(provider),
+        storage,
+        indicators,
+        manifest,
+        panel,
+    )
+
+
+def test_import_updates_manifest_and_derived_data(services, pair):
+    _, storage, manifest, indicators, panel = services
+    importer = build_importer(services, FakeProvider(3))
+    assert importer.import_quotes(pair, TIME_UNIT) == 15
+    assert importer.import_quotes(pair, TIME_UNIT) == 15
+
+    entry = manifest.get(pair, TIME_UNIT)
+    assert (entry.rows, entry.last_timestamp) == (30, 29 * MINUTE)
+    assert entry.bytes == storage.series_size(pair, TIME_UNIT)
+    assert len(read_csv(indicators.get_data_file(pair, TIME_UNIT))) == 30
+    assert panel.load(TIME_UNIT).values["close"].shape == (30, 1)
+
+
+def test_failed_import_only_keeps_committed_pages(services, pair):
+    _, storage, manifest, indicators, panel = services
+    build_importer(services, FakeProvider(1)).import_quotes(pair, TIME_UNIT)
+    with pytest.raises(RuntimeError):
+        build_importer(services, FakeProvider(5, fail_at=3)).import_quotes(
+            pair, TIME_UNIT
+        )
+
+    # Pages 0 and 1 made a checkpoint, page 2 was rolled back.
+    assert len(storage.load_quotes(pair, TIME_UNIT)) == 15
+    assert len(read_csv(indicators.get_data_file(pair, TIME_UNIT))) == 15
+    assert panel.load(TIME_UNIT).values["close"].shape == (15, 1)
+    entry = manifest.get(pair, TIME_UNIT)
+    assert entry.rows == 15
+    assert entry.bytes == storage.series_size(pair, TIME_UNIT)
+
+
+def test_planning_rebuilds_missing_manifest_entries_once(services, pair, monkeypatch):
+    _, storage, manifest, _, _ = services
+    storage.save_quotes(pair, TIME_UNIT, [build_page(0), build_page(5)])
+    importer = build_importer(services, FakeProvider(0))
+
+    assert importer.reconcile_manifest([pair], TIME_UNIT) == 1
+    assert manifest.get(pair, TIME_UNIT).rows == 10
+    assert importer.reconcile_manifest([pair], TIME_UNIT) == 0
+
+    def read_whole_series(*args):
+        raise AssertionError("the series was read")
+
+    monkeypatch.setattr(storage, "last_timestamp", read_whole_series)
+    assert importer.get_last_timestamp(pair, TIME_UNIT) == 9 * MINUTE
@@ -0,0 +1,81 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from models.enums import TimeUnits
+from models.pair import Pair
+from services.client import BinanceClient
+from services.quotes_storer import QuotesPairStorer
+
+TIME_UNIT = TimeUnits.HOUR1
+
+
+class FakeImporter:
+    location = "memory"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.imported = []
+
+    def reconcile_manifest(self, pairs, time_unit):
+        return 0
+
+    def get_last_timestamp(self, pair, time_unit):
+        return None
+
+    def import_quotes(self, pair, time_unit):
+        time.sleep(self.delay)
+        self.imported.append(pair.symbol)
+        return 10
+
+
+class FakePairsRepository:
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+    def get_available_pairs(self):
+        return self.pairs
+
+
+class FakeProviders:
+    def name_for(self, pair):
+        return BinanceClient.NAME
+
+    @staticmethod
+    def provider_class(name):
+        return BinanceClient
+
+
+def build_storer(importer, pairs):
+    return QuotesPairStorer(
+        QuotesPairStorer.Configuration(),
+        importer,
+        FakePairsRepository(pairs),
+        None,
+        None,
+        FakeProviders(),
+    )
+
+
+def test_plan_ranks_pairs_by_trade_count():
+    pairs = [
+        Pair("AUSDT", "A", "USDT", trades_24h=10),
+        Pair("BBTC", "B", "BTC", trades_24h=100000),
+        Pair("CUSDT", "C", "USDT", status="BREAK", trades_24h=10**6),
+    ]
+    jobs = build_storer(FakeImporter(), pairs).plan_updates(pairs, TIME_UNIT)
+    assert [job.pair.symbol for job in jobs] == ["BBTC", "AUSDT"]
+
+
+def test_interrupt_stops_the_queues():
+    importer = FakeImporter(delay=0.1)
+    pairs = [Pair(f"P{index}USDT", f"P{index}", "USDT") for index in range(20)]
+    timer = threading.Timer(0.25, os.kill, [os.getpid(), signal.SIGINT])
+    timer.start()
+    with pytest.raises(KeyboardInterrupt):
+        build_storer(importer, pairs).store_all_quotes(TIME_UNIT)
+    timer.cancel()
+    assert len(importer.imported) < 5
@@ -0,0 +1,60 @@
+import json
+import threading
+import zlib
+from http.client import HTTPConnection
+
+import pytest
+
+from services.server import QuotesServer
+
+
+class FailingRepository:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def get_series(self, *args, **kwargs):
+        raise self.error
+
+
+class StoredSeries:
+    def series_version(self, pair, time_unit):
+        return 1, 1
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(error):
+        server = QuotesServer(
+            ("127.0.0.1", 0), FailingRepository(error), StoredSeries(), None
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return HTTPConnection(*server.server_address)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize(
+    "error, status",
+    [
+        (ValueError("Error tokenizing data"), 503),
+        (zlib.error("invalid block type"), 503),
+        (EOFError("Compressed file ended before the end-of-stream marker"), 503),
+        (KeyError("close"), 500),
+    ],
+)
+def test_read_errors_are_answered_with_json(serve, error, status):
+    connection = serve(error)
+    connection.request("GET", "/quotes?symbol=ETHBTC&time_unit=1h")
+    response = connection.getresponse()
+
+    assert response.status == status
+    assert "error" in json.loads(response.read())
+    # The connection is kept for the next request.
+    connection.request("GET", "/quotes?symbol=ETHBTC&time_unit=1h")
+    assert connection.getresponse().status == status